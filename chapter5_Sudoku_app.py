@@ -1,14 +1,296 @@
 import random
 import sys
-import copy
+import time
+from collections import deque
 from PyQt6.QtGui import QIntValidator
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QThread, pyqtSignal
 from PyQt6.QtWidgets import(
-    QApplication, QWidget, QGridLayout, QLineEdit, QPushButton, QMessageBox, QHBoxLayout, QVBoxLayout, QLabel
+    QApplication, QWidget, QGridLayout, QLineEdit, QPushButton, QMessageBox, QHBoxLayout, QVBoxLayout, QLabel,
+    QComboBox, QSpinBox, QProgressDialog, QCheckBox
 )
 
+DIFFICULTIES = ["Easy", "Medium", "Hard"]
+
+
+class SolveCancelled(Exception):
+    """Raised inside the search when the caller asks it to stop"""
+
+
+class NodeLimitReached(SolveCancelled):
+    """Raised when a search exceeds its node budget"""
+
+
+class SudokuEngine:
+    """Fast Sudoku engine: bitset candidates, constraint propagation and MRV search"""
+    def __init__(self, box=3):
+        self.box = box
+        self.size = box * box
+        self.full = (1 << self.size) - 1
+        n = self.size
+        # Units are numbered rows 0..n-1, columns n..2n-1, boxes 2n..3n-1
+        self.units = []
+        for r in range(n):
+            self.units.append([r * n + c for c in range(n)])
+        for c in range(n):
+            self.units.append([r * n + c for r in range(n)])
+        for b in range(n):
+            r0, c0 = box * (b // box), box * (b % box)
+            self.units.append([(r0 + i) * n + c0 + j for i in range(box) for j in range(box)])
+        self.cell_units = []
+        for i in range(n * n):
+            r, c = divmod(i, n)
+            self.cell_units.append((r, n + c, 2 * n + box * (r // box) + c // box))
+        self.nodes = 0
+        # Optional hooks polled during search: should_stop() -> bool, on_progress(nodes)
+        self.should_stop = None
+        self.on_progress = None
+        self.node_limit = None
+
+    # Board conversion
+    def _load(self, board):
+        values = [v for row in board for v in row]
+        used = [0] * (3 * self.size)
+        for i, v in enumerate(values):
+            if v:
+                bit = 1 << (v - 1)
+                for u in self.cell_units[i]:
+                    if used[u] & bit:
+                        return None, None
+                    used[u] |= bit
+        return values, used
+
+    def _to_board(self, values):
+        n = self.size
+        return [values[r * n:(r + 1) * n] for r in range(n)]
+
+    def _place(self, values, used, i, bit):
+        values[i] = bit.bit_length()
+        for u in self.cell_units[i]:
+            used[u] |= bit
+
+    def candidates(self, values, used, i):
+        a, b, c = self.cell_units[i]
+        return self.full & ~(used[a] | used[b] | used[c])
+
+    def propagate(self, values, used, hidden=True):
+        """Apply naked (and optionally hidden) singles until fixpoint.
+
+        Returns (ok, techniques) where techniques is the set of rules that placed a digit.
+        """
+        techniques = set()
+        changed = True
+        while changed:
+            changed = False
+            for i, v in enumerate(values):
+                if v:
+                    continue
+                cand = self.candidates(values, used, i)
+                if not cand:
+                    return False, techniques
+                if cand & (cand - 1) == 0:
+                    self._place(values, used, i, cand)
+                    techniques.add("naked")
+                    changed = True
+            if changed or not hidden:
+                continue
+            for u, cells in enumerate(self.units):
+                once = twice = 0
+                for i in cells:
+                    if not values[i]:
+                        cand = self.candidates(values, used, i)
+                        twice |= once & cand
+                        once |= cand
+                if (self.full & ~used[u]) & ~once:
+                    return False, techniques
+                single = once & ~twice & ~used[u]
+                while single:
+                    bit = single & -single
+                    single ^= bit
+                    for i in cells:
+                        if not values[i] and self.candidates(values, used, i) & bit:
+                            self._place(values, used, i, bit)
+                            break
+                    techniques.add("hidden")
+                    changed = True
+        return True, techniques
+
+    def _search(self, values, used, solutions, limit, rng):
+        self.nodes += 1
+        if self.node_limit is not None and self.nodes > self.node_limit:
+            raise NodeLimitReached()
+        if self.nodes % 2048 == 0:
+            if self.on_progress is not None:
+                self.on_progress(self.nodes)
+            if self.should_stop is not None and self.should_stop():
+                raise SolveCancelled()
+        ok, _ = self.propagate(values, used)
+        if not ok:
+            return
+        best, best_cand, best_count = -1, 0, self.size + 1
+        for i, v in enumerate(values):
+            if not v:
+                cand = self.candidates(values, used, i)
+                count = cand.bit_count()
+                if count < best_count:
+                    best, best_cand, best_count = i, cand, count
+                    if count == 2:
+                        break
+        if best < 0:
+            solutions.append(values[:])
+            return
+        bits = []
+        while best_cand:
+            bit = best_cand & -best_cand
+            best_cand ^= bit
+            bits.append(bit)
+        if rng is not None:
+            rng.shuffle(bits)
+        for bit in bits:
+            child_values, child_used = values[:], used[:]
+            self._place(child_values, child_used, best, bit)
+            self._search(child_values, child_used, solutions, limit, rng)
+            if len(solutions) >= limit:
+                return
+
+    def solve(self, board, rng=None):
+        """Return a solved copy of board, or None if it has no solution"""
+        values, used = self._load(board)
+        if values is None:
+            return None
+        solutions = []
+        self._search(values, used, solutions, 1, rng)
+        return self._to_board(solutions[0]) if solutions else None
+
+    def count_solutions(self, board, limit=2, max_nodes=None):
+        """Count solutions up to limit; returns None if max_nodes is exhausted first"""
+        values, used = self._load(board)
+        if values is None:
+            return 0
+        solutions = []
+        self.node_limit = None if max_nodes is None else self.nodes + max_nodes
+        try:
+            self._search(values, used, solutions, limit, None)
+        except NodeLimitReached:
+            return None
+        finally:
+            self.node_limit = None
+        return len(solutions)
+
+    @property
+    def difficulties(self):
+        """Grades generate() can reach on this board size"""
+        # Singles alone always finish a 4x4 board, so it never grades above Easy
+        return DIFFICULTIES[:1] if self.box <= 2 else DIFFICULTIES
+
+    def grade(self, board):
+        """Grade a puzzle by the weakest propagation that solves it without guessing"""
+        for hidden, level in ((False, "Easy"), (True, "Medium")):
+            values, used = self._load(board)
+            if values is None:
+                return None
+            ok, _ = self.propagate(values, used, hidden=hidden)
+            if ok and all(values):
+                return level
+        return "Hard"
+
+    def generate(self, difficulty="Medium", rng=None):
+        """Generate a unique-solution puzzle no harder than difficulty.
+
+        Returns (puzzle, solution, grade).
+        """
+        rng = rng or random.Random()
+        n = self.size
+        solution = self.solve([[0] * n for _ in range(n)], rng)
+        puzzle = [row[:] for row in solution]
+        target = DIFFICULTIES.index(difficulty)
+        cells = [(r, c) for r in range(n) for c in range(n)]
+        rng.shuffle(cells)
+        # Uniqueness proofs blow up on big sparse boards, so bound each check
+        # and treat an exhausted budget as "not unique"
+        max_nodes = None if self.box <= 3 else 50
+        for r, c in cells:
+            if self.should_stop is not None and self.should_stop():
+                raise SolveCancelled()
+            value = puzzle[r][c]
+            puzzle[r][c] = 0
+            if (self.count_solutions(puzzle, max_nodes=max_nodes) != 1
+                    or DIFFICULTIES.index(self.grade(puzzle)) > target):
+                puzzle[r][c] = value
+        return puzzle, solution, self.grade(puzzle)
+
+
+class SolveWorker(QThread):
+    """Solves a board off the GUI thread with a time budget and cancellation"""
+    progress = pyqtSignal(int)
+    solved = pyqtSignal(object)
+    stopped = pyqtSignal(str)
+
+    def __init__(self, board, box=3, time_budget=10.0):
+        super().__init__()
+        self.board = board
+        self.engine = SudokuEngine(box)
+        self.time_budget = time_budget
+        self.timed_out = False
+
+    def _should_stop(self):
+        if time.monotonic() > self.deadline:
+            self.timed_out = True
+            return True
+        return self.isInterruptionRequested()
+
+    def run(self):
+        self.deadline = time.monotonic() + self.time_budget
+        self.engine.should_stop = self._should_stop
+        self.engine.on_progress = self.progress.emit
+        try:
+            solution = self.engine.solve(self.board)
+        except SolveCancelled:
+            self.stopped.emit("timeout" if self.timed_out else "cancelled")
+            return
+        self.solved.emit(solution)
+
+
+class PuzzlePoolThread(QThread):
+    """Keeps a small pool of generated puzzles per difficulty so New Game is instant"""
+    pool_updated = pyqtSignal(str, int)
+
+    def __init__(self, box=3, pool_size=3):
+        super().__init__()
+        self.engine = SudokuEngine(box)
+        self.pool_size = pool_size
+        self.pool = {d: deque() for d in self.engine.difficulties}
+        self.wanted = None  # difficulty someone is waiting for, generated first
+
+    def take(self, difficulty):
+        """Pop a ready puzzle (puzzle, solution) or None if the pool is empty"""
+        try:
+            return self.pool[difficulty].popleft()
+        except IndexError:
+            return None
+
+    def run(self):
+        rng = random.Random()
+        self.engine.should_stop = self.isInterruptionRequested
+        while not self.isInterruptionRequested():
+            missing = [d for d in self.pool if len(self.pool[d]) < self.pool_size]
+            if not missing:
+                self.msleep(200)
+                continue
+            target = self.wanted if self.wanted in missing else missing[-1]
+            try:
+                puzzle, solution, grade = self.engine.generate(target, rng)
+            except SolveCancelled:
+                return
+            if len(self.pool[grade]) < self.pool_size:
+                self.pool[grade].append((puzzle, solution))
+                self.pool_updated.emit(grade, len(self.pool[grade]))
+
+
+BOARD_SIZES = {"4x4": 2, "9x9": 3, "16x16": 4, "25x25": 5}
+
+
 class SudokuSolver(QWidget):
-    def __init__(self):
+    def __init__(self, box=3):
         super().__init__()
         self.setWindowTitle("Sudoku Solver with PyQt6")
         self.setGeometry(100, 100, 450, 540)
@@ -20,27 +302,17 @@ class SudokuSolver(QWidget):
         title_label = QLabel("Sudoku Solver")
         title_label.setStyleSheet("font-size: 34px; font-weight: bold;")
         title_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        instruction_label = QLabel("Fill the Sudoku grid with digits 1-9 use 'Get Hint' up to 5 times oer puzzle.")
-        instruction_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.instruction_label = QLabel()
+        self.instruction_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
 
         self.main_layout.addWidget(title_label)
-        self.main_layout.addWidget(instruction_label)
+        self.main_layout.addWidget(self.instruction_label)
 
-        self.grid_layout = QGridLayout()
-        self.cells = [[QLineEdit(self) for _ in range(9)] for _ in range(9)]
+        self.grid_widget = None
+        self.cells = []
         self.hint_count = 0
         self.max_hints = 5
 
-        for row in range(9):
-            for col in range(9):
-                cell = self.cells[row][col]
-                cell.setFixedSize(40, 40)
-                cell.setAlignment(Qt.AlignmentFlag.AlignCenter)
-                cell.setMaxLength(1)
-                cell.setStyleSheet("font-size: 16px")
-                cell.setValidator(QIntValidator(1, 9, self))
-                self.grid_layout.addWidget(cell, row, col)
-
         self.hint_btn = QPushButton(f"Get Hint ({self.max_hints - self.hint_count}) left")
         self.hint_btn.clicked.connect(self.provide_hint)
 
@@ -53,90 +325,399 @@ class SudokuSolver(QWidget):
         new_btn = QPushButton("New Game")
         new_btn.clicked.connect(self.start_new_game)
 
+        self.difficulty_combo = QComboBox()
+        self.difficulty_combo.addItems(DIFFICULTIES)
+        self.difficulty_combo.setCurrentText("Medium")
+
+        self.size_combo = QComboBox()
+        self.size_combo.addItems(BOARD_SIZES)
+
 
         btn_layout = QHBoxLayout()
         btn_layout.addWidget(solver_btn)
         btn_layout.addWidget(self.hint_btn)
         btn_layout.addWidget(clear_btn)
         btn_layout.addWidget(new_btn)
+        btn_layout.addWidget(self.difficulty_combo)
+        btn_layout.addWidget(self.size_combo)
 
-        self.main_layout.addLayout(self.grid_layout)
+        self.budget_spin = QSpinBox()
+        self.budget_spin.setRange(1, 600)
+        self.budget_spin.setValue(10)
+        self.budget_spin.setPrefix("Time budget: ")
+        self.budget_spin.setSuffix(" s")
+        btn_layout.addWidget(self.budget_spin)
+
+        self.pencil_check = QCheckBox("Pencil marks")
+        self.pencil_check.toggled.connect(self.refresh_pencil_marks)
+        btn_layout.addWidget(self.pencil_check)
+
+        self.grid_holder = QVBoxLayout()
+        self.main_layout.addLayout(self.grid_holder)
         self.main_layout.addLayout(btn_layout)
         self.setLayout(self.main_layout)
-        
+
+        # Cached solution, flattened, and how many entries currently disagree with it
+        self.solution = None
+        self.solution_values = None
+        self.disagreements = 0
+        self.solve_worker = None
+        self.solve_progress = None
+        # Bumped whenever the board is replaced so late worker results are dropped
+        self.solve_generation = 0
+        self.puzzle_pool = None
+        self.puzzle_wait = None
+        self.set_box(box)
+        self.size_combo.setCurrentText(f"{self.size}x{self.size}")
+        self.size_combo.currentTextChanged.connect(lambda text: self.set_box(BOARD_SIZES[text]))
+
+    def set_box(self, box):
+        """Rebuild the grid for a (box*box) x (box*box) board"""
+        if self.grid_widget is not None and box == self.box:
+            return
+        self.cancel_solve()
+        self.box = box
+        self.size = box * box
+        self.engine = SudokuEngine(box)
+        self.instruction_label.setText(
+            f"Fill the Sudoku grid with digits 1-{self.size} use 'Get Hint' up to 5 times oer puzzle.")
+        # Only offer the grades this board size can produce
+        difficulty = self.difficulty_combo.currentText()
+        self.difficulty_combo.clear()
+        self.difficulty_combo.addItems(self.engine.difficulties)
+        if difficulty in self.engine.difficulties:
+            self.difficulty_combo.setCurrentText(difficulty)
+        self.reset_occupancy()
+        self.build_grid()
+        self.clear_board()
+
+        # Generate puzzles in the background so "New Game" never waits
+        self.cancel_puzzle_wait()
+        self.stop_pool()
+        self.puzzle_pool = PuzzlePoolThread(box)
+        self.puzzle_pool.start()
+
+    def build_grid(self):
+        if self.grid_widget is not None:
+            self.grid_holder.removeWidget(self.grid_widget)
+            self.grid_widget.deleteLater()
+
+        n, box = self.size, self.box
+        cell_size = {2: 48, 3: 40, 4: 32, 5: 26}.get(box, 26)
+        font_size = cell_size * 2 // 5
+        # One stylesheet for the whole grid instead of one per cell keeps
+        # 625-cell boards quick to build and restyle
+        self.grid_widget = QWidget(self)
+        self.grid_widget.setUpdatesEnabled(False)
+        self.grid_widget.setStyleSheet(f"""
+            QLineEdit {{ font-size: {font_size}px; }}
+            QLineEdit[given="true"] {{ font-weight: bold; background-color: #EEEEEE; }}
+            QLineEdit[hint="true"] {{ color: blue; }}
+            QLineEdit[pencil="true"] {{ font-size: {max(font_size // 2, 7)}px; color: #888888; }}
+            QLineEdit[conflict="true"] {{ background-color: #FFB3B3; }}
+        """)
+        self.grid_layout = QGridLayout(self.grid_widget)
+        self.grid_layout.setSpacing(1)
+        validator = QIntValidator(1, n, self.grid_widget)
+        max_length = len(str(n))
+
+        self.cells = [[QLineEdit(self.grid_widget) for _ in range(n)] for _ in range(n)]
+        for row in range(n):
+            for col in range(n):
+                cell = self.cells[row][col]
+                cell.setFixedSize(cell_size, cell_size)
+                cell.setAlignment(Qt.AlignmentFlag.AlignCenter)
+                cell.setMaxLength(max_length)
+                cell.setValidator(validator)
+                cell.textChanged.connect(lambda text, i=row * n + col: self.on_cell_changed(i, text))
+                # Leave an empty grid row/column between boxes as a separator
+                self.grid_layout.addWidget(cell, row + row // box, col + col // box)
+        for k in range(1, box):
+            self.grid_layout.setRowMinimumHeight(k * (box + 1) - 1, 4)
+            self.grid_layout.setColumnMinimumWidth(k * (box + 1) - 1, 4)
+
+        self.grid_holder.addWidget(self.grid_widget, alignment=Qt.AlignmentFlag.AlignCenter)
+        self.grid_widget.setUpdatesEnabled(True)
+        self.adjustSize()
+
+    def set_cell_role(self, cell, given=False, hint=False):
+        cell.setProperty("given", given)
+        cell.setProperty("hint", hint)
+        cell.setReadOnly(given)
+        cell.style().unpolish(cell)
+        cell.style().polish(cell)
+
+    def set_cell_flag(self, cell, name, value):
+        # Re-polishing is the expensive part, so only do it when the flag flips
+        if bool(cell.property(name)) != value:
+            cell.setProperty(name, value)
+            cell.style().unpolish(cell)
+            cell.style().polish(cell)
+
+    def reset_occupancy(self):
+        """Forget all entries: per-unit digit -> cells sets and digit bitmasks"""
+        n = self.size
+        self.values = [0] * (n * n)
+        self.unit_cells = [[set() for _ in range(n + 1)] for _ in range(3 * n)]
+        self.unit_masks = [0] * (3 * n)
+
+    def on_cell_changed(self, i, text):
+        """Update occupancy for one edited cell and restyle only the cells whose conflict state can change"""
+        new = int(text) if text.isdigit() and 1 <= int(text) <= self.size else 0
+        old = self.values[i]
+        if new == old:
+            return
+        units = self.engine.cell_units[i]
+        touched = {i}
+        if old:
+            for u in units:
+                cells = self.unit_cells[u][old]
+                cells.discard(i)
+                if not cells:
+                    self.unit_masks[u] &= ~(1 << (old - 1))
+                elif len(cells) == 1:
+                    touched |= cells
+        self.values[i] = new
+        if self.solution is not None:
+            expected = self.solution_values[i]
+            self.disagreements += (bool(new) and new != expected) - (bool(old) and old != expected)
+        if new:
+            for u in units:
+                cells = self.unit_cells[u][new]
+                cells.add(i)
+                self.unit_masks[u] |= 1 << (new - 1)
+                if len(cells) == 2:
+                    touched |= cells
+        n = self.size
+        for j in touched:
+            self.set_cell_flag(self.cells[j // n][j % n], "conflict", self.in_conflict(j))
+        if self.pencil_check.isChecked():
+            self.update_pencil_mark(i)
+            for u in units:
+                for j in self.engine.units[u]:
+                    if not self.values[j]:
+                        self.update_pencil_mark(j)
+
+    def in_conflict(self, i):
+        v = self.values[i]
+        return bool(v) and any(len(self.unit_cells[u][v]) > 1 for u in self.engine.cell_units[i])
+
+    def cell_candidates(self, row, col):
+        """Digits still allowed in a cell given the current entries"""
+        a, b, c = self.engine.cell_units[row * self.size + col]
+        mask = self.engine.full & ~(self.unit_masks[a] | self.unit_masks[b] | self.unit_masks[c])
+        return [d + 1 for d in range(self.size) if mask >> d & 1]
+
+    def update_pencil_mark(self, i):
+        n = self.size
+        cell = self.cells[i // n][i % n]
+        show = self.pencil_check.isChecked() and not self.values[i]
+        if show:
+            sep = "" if n <= 9 else " "
+            cell.setPlaceholderText(sep.join(map(str, self.cell_candidates(i // n, i % n))))
+        else:
+            cell.setPlaceholderText("")
+        self.set_cell_flag(cell, "pencil", show)
+
+    def refresh_pencil_marks(self):
+        self.grid_widget.setUpdatesEnabled(False)
+        for i in range(self.size * self.size):
+            self.update_pencil_mark(i)
+        self.grid_widget.setUpdatesEnabled(True)
+
+    def stop_pool(self):
+        if self.puzzle_pool is not None:
+            self.puzzle_pool.requestInterruption()
+            self.puzzle_pool.wait()
+            self.puzzle_pool = None
+
+    def closeEvent(self, event):
+        self.cancel_solve()
+        self.cancel_puzzle_wait()
+        self.stop_pool()
+        super().closeEvent(event)
 
     def get_board(self):
-        board = []
-        for row in range(9):
-            board_row = []
-            for col in range(9):
-                text = self.cells[row][col].text()
-                try:
-                    if text == '':
-                        board_row.append(0)
-                    elif text.isdigit():
-                        num = int(text)
-                        if 1 <= num <= 9:
-                            board_row.append(num)
-                        else:
-                            raise ValueError
-                    else:
-                        raise ValueError
-                except ValueError:
-                    QMessageBox.warning(self, "Invalid Input", f"Cell ({row+1}, {col+1}) contains an invalid entry.")
-                    return None
-            board.append(board_row)
-        return board
+        # Entries are tracked by on_cell_changed, so no need to reread the widgets
+        n = self.size
+        return [self.values[r * n:(r + 1) * n] for r in range(n)]
     
     def set_board(self, board):
-        for row in range(9):
-            for  col in range(9):
+        # Apply the whole grid in one batched repaint
+        self.grid_widget.setUpdatesEnabled(False)
+        for row in range(self.size):
+            for  col in range(self.size):
                 self.cells[row][col].setText(str(board[row][col]) if board[row][col] != 0 else "")
+        self.grid_widget.setUpdatesEnabled(True)
     
     def clear_board(self):
-        for row in range(9):
-            for col in range(9):
-                self.cells[row][col].clear()
-                self.cells[row][col].setStyleSheet("font-size: 16px;")
+        self.cancel_solve()
+        self.grid_widget.setUpdatesEnabled(False)
+        for row in range(self.size):
+            for col in range(self.size):
+                cell = self.cells[row][col]
+                cell.blockSignals(True)
+                cell.clear()
+                cell.blockSignals(False)
+                if cell.property("given") or cell.property("hint"):
+                    self.set_cell_role(cell)
+                self.set_cell_flag(cell, "conflict", False)
+        self.reset_occupancy()
+        if self.pencil_check.isChecked():
+            self.refresh_pencil_marks()
+        self.grid_widget.setUpdatesEnabled(True)
         self.hint_count = 0
         self.hint_btn.setText(f"Get Hint ({self.max_hints - self.hint_count}) left")
+        self.set_solution(None)
+
+    def set_solution(self, solution):
+        """Cache a solution and count the current entries that disagree with it"""
+        self.solution = solution
+        if solution is None:
+            self.solution_values = None
+            self.disagreements = 0
+            return
+        self.solution_values = [v for row in solution for v in row]
+        self.disagreements = sum(1 for v, expected in zip(self.values, self.solution_values) if v and v != expected)
+
+    def cached_solution(self):
+        """Return the cached solution if every entry still agrees with it, else None"""
+        # on_cell_changed keeps the disagreement count, so this is O(1)
+        if self.solution is not None and self.disagreements == 0:
+            return self.solution
+        return None
+
+    def request_solution(self, board, on_solved):
+        """Call on_solved(solution) with the cached solution or after solving in a worker.
+
+        on_solved receives None when the board has no solution; it is not called
+        when the user cancels or the time budget runs out.
+        """
+        solution = self.cached_solution()
+        if solution is not None:
+            on_solved(solution)
+            return
+        if self.solve_worker is not None:
+            return
+
+        progress = QProgressDialog("Solving...", "Cancel", 0, 0, self)
+        progress.setWindowTitle("Solving")
+        progress.setWindowModality(Qt.WindowModality.WindowModal)
+        # Block input at once so the board cannot change under the worker
+        progress.setMinimumDuration(0)
+
+        worker = SolveWorker(board, box=self.box, time_budget=self.budget_spin.value())
+        self.solve_worker = worker
+        self.solve_progress = progress
+        generation = self.solve_generation
+
+        def finish():
+            progress.canceled.disconnect()
+            progress.close()
+            self.solve_worker = None
+            self.solve_progress = None
+
+        def solved(solution):
+            if generation != self.solve_generation:
+                return
+            finish()
+            if solution is not None:
+                self.set_solution(solution)
+            on_solved(solution)
+
+        def stopped(reason):
+            if generation != self.solve_generation:
+                return
+            finish()
+            if reason == "timeout":
+                QMessageBox.warning(self, "Time Budget", f"Solver gave up after {self.budget_spin.value()} s.")
+
+        worker.progress.connect(lambda nodes: progress.setLabelText(f"Solving... nodes explored: {nodes:,}"))
+        worker.solved.connect(solved)
+        worker.stopped.connect(stopped)
+        worker.finished.connect(worker.deleteLater)
+        progress.canceled.connect(worker.requestInterruption)
+        worker.start()
+
+    def cancel_solve(self):
+        """Stop a running solve and make sure its result is never applied"""
+        if self.solve_worker is None:
+            return
+        worker, progress = self.solve_worker, self.solve_progress
+        self.solve_generation += 1
+        self.solve_worker = None
+        self.solve_progress = None
+        worker.requestInterruption()
+        worker.wait()
+        progress.canceled.disconnect()
+        progress.close()
     
     def start_new_game(self):
+        if self.puzzle_wait is not None:
+            return
+        self.cancel_solve()
+        difficulty = self.difficulty_combo.currentText()
+        entry = self.puzzle_pool.take(difficulty)
+        if entry is None:
+            self.wait_for_puzzle(difficulty)
+        else:
+            self.show_puzzle(*entry, difficulty)
+
+    def wait_for_puzzle(self, difficulty):
+        """Show progress until the background pool delivers a puzzle of this difficulty"""
+        progress = QProgressDialog(f"Generating a {difficulty} puzzle...", "Cancel", 0, 0, self)
+        progress.setWindowTitle("New Game")
+        progress.setWindowModality(Qt.WindowModality.WindowModal)
+        progress.setMinimumDuration(300)
+        pool = self.puzzle_pool
+        pool.wanted = difficulty
+
+        def pool_updated(grade, _):
+            if grade != difficulty:
+                return
+            entry = pool.take(difficulty)
+            if entry is not None:
+                self.cancel_puzzle_wait()
+                self.show_puzzle(*entry, difficulty)
+
+        pool.pool_updated.connect(pool_updated)
+        progress.canceled.connect(self.cancel_puzzle_wait)
+        self.puzzle_wait = (progress, pool_updated)
+
+    def cancel_puzzle_wait(self):
+        if self.puzzle_wait is None:
+            return
+        progress, slot = self.puzzle_wait
+        self.puzzle_wait = None
+        self.puzzle_pool.pool_updated.disconnect(slot)
+        self.puzzle_pool.wanted = None
+        progress.canceled.disconnect(self.cancel_puzzle_wait)
+        progress.close()
+
+    def show_puzzle(self, puzzle, solution, difficulty):
         self.clear_board()
-        QMessageBox.information(self, "New Game", "New game Board cleared.")
+        self.grid_widget.setUpdatesEnabled(False)
+        for row in range(self.size):
+            for col in range(self.size):
+                if puzzle[row][col]:
+                    cell = self.cells[row][col]
+                    cell.setText(str(puzzle[row][col]))
+                    self.set_cell_role(cell, given=True)
+        self.grid_widget.setUpdatesEnabled(True)
+        self.set_solution(solution)
+        clues = sum(1 for row in puzzle for v in row if v)
+        QMessageBox.information(self, "New Game", f"New {difficulty} puzzle with {clues} clues.")
 
     
-    def is_valid(self, board, row, col, num):
-        for i in range(9):
-            if board[row][i] == num or board[i][col] == num:
-                return False
-        start_row, start_col = 3 * (row // 3), 3 * (col // 3)
-        for i in range(start_row, start_row + 3):
-            for j in range(start_col, start_col + 3):
-                if board[i][j] == num:
-                    return False
-        return True
-    
-    def solver_sudoku(self, board):
-        for row in range(9):
-            for col in range(9):
-                if board[row][col] == 0:
-                    for num in range(1, 10):
-                        if self.is_valid(board, row, col, num):
-                            board[row][col] = num
-                            if self.solver_sudoku(board):
-                                return True
-                            board[row][col] = 0
-                    return False
-        return True
-                    
-    
     def solver(self):
         board = self.get_board()
         if board is None:
             return
-        if self.solver_sudoku(board):
-            self.set_board(board)
+        self.request_solution(board, self.apply_solution)
+
+    def apply_solution(self, solution):
+        if solution is not None:
+            self.set_board(solution)
         else:
             QMessageBox.warning(self, "No Solution", "No valid solution exists for the current sudoku puzzle.")
     
@@ -148,14 +729,14 @@ class SudokuSolver(QWidget):
         current_board = self.get_board()
         if current_board is None:
             return
-        
-        solver_board = copy.deepcopy(current_board)
+        self.request_solution(current_board, lambda solution: self.apply_hint(current_board, solution))
 
-        if not self.solver_sudoku(solver_board):
+    def apply_hint(self, current_board, solver_board):
+        if solver_board is None:
             QMessageBox.warning(self, "No Solution", "No valid solution exists for the current puzzle.")
             return
         
-        hint_candidates = [(r, c) for r in range(9) for c in range(9) if current_board[r][c] == 0 and solver_board[r][c] != 0]
+        hint_candidates = [(r, c) for r in range(self.size) for c in range(self.size) if current_board[r][c] == 0 and solver_board[r][c] != 0]
 
         if not hint_candidates:
             QMessageBox.information(self, "Hint", "No empty cells available for hints.")
@@ -164,7 +745,7 @@ class SudokuSolver(QWidget):
         row, col = random.choice(hint_candidates)
         hint_value = solver_board[row][col]
         self.cells[row][col].setText(str(hint_value))
-        self.cells[row][col].setStyleSheet("font-size: 16px; color: blue;")
+        self.set_cell_role(self.cells[row][col], hint=True)
         self.hint_count += 1
         self.hint_btn.setText(f"Get Hint ({self.max_hints - self.hint_count}) left")
     
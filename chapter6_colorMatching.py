@@ -1,17 +1,76 @@
 import sys
+import os
+import json
 import time
+import queue
 import logging
+import multiprocessing
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QPushButton,
-    QLabel, QHBoxLayout, QLineEdit, QTableWidget, QDialog, QFormLayout,
-    QGraphicsScene, QGraphicsItem,  QGraphicsView, QMenu, QComboBox
+    QLabel, QHBoxLayout, QLineEdit, QTableView, QDialog, QFormLayout,
+    QGraphicsScene, QGraphicsItem,  QGraphicsView, QMenu, QComboBox, QSpinBox,
+    QStyledItemDelegate, QMessageBox
 )
 from PyQt6.QtGui import QPainter, QColor, QPen, QFont, QBrush, QFontMetrics, QIcon
-from PyQt6.QtCore import Qt, QRectF, QPointF, QTimer
+from PyQt6.QtCore import Qt, QRectF, QPointF, QTimer, QThread, pyqtSignal, QAbstractTableModel, QModelIndex
 import random
+import heapq
+from array import array
 
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
 
+COLOR_MAP = {
+    "red": "#FF0000",
+    "orange": "#FFA500",
+    "yellow": "#FFFF00",
+    "green": "#00FF00", 
+    "blue": "#0000FF", 
+    "purple": "#800080",
+    "black": "#000000", 
+    "white": "#FFFFFF", 
+    "brown": "#8B4513",
+}
+
+
+class CellStyle:
+    """Pens, font, metrics and brushes shared by every cell of one size"""
+    _by_size = {}
+    _brushes = {}
+
+    @classmethod
+    def for_size(cls, cell_size):
+        style = cls._by_size.get(cell_size)
+        if style is None:
+            if len(cls._by_size) > 32:
+                # Window resizes produce many sizes; keep only recent ones
+                cls._by_size.clear()
+            style = cls._by_size[cell_size] = cls(cell_size)
+        return style
+
+    def __init__(self, cell_size):
+        self.rect = QRectF(-cell_size / 2, -cell_size / 2, cell_size, cell_size)
+        self.border_pen = QPen(Qt.GlobalColor.black, 1.5)
+        self.conflict_pen = QPen(QColor("#E00000"), max(2.0, cell_size * 0.08))
+        self.text_pen = QPen(Qt.GlobalColor.black)
+        self.font = QFont("Segoe UI", max(1, int(cell_size * 0.2)), QFont.Weight.Medium)
+        self.metrics = QFontMetrics(self.font)
+        self.text_widths = {}
+
+    def text_width(self, text):
+        width = self.text_widths.get(text)
+        if width is None:
+            width = self.text_widths[text] = self.metrics.horizontalAdvance(text)
+        return width
+
+    @classmethod
+    def brush(cls, color):
+        key = color.rgba()
+        brush = cls._brushes.get(key)
+        if brush is None:
+            brush = cls._brushes[key] = QBrush(color)
+        return brush
+
+
 class ColorCell(QGraphicsItem):
     def __init__(self, color_name, color_list, parent_window, i, j, cell_size, parent=None):
         super().__init__(parent)
@@ -24,31 +83,41 @@ class ColorCell(QGraphicsItem):
         self.i = i
         self.j = j
         self.cell_size = cell_size
-        self.toggle_state = False
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.toggle_flash_color)
+        self.style = CellStyle.for_size(cell_size)
+        # Text position is laid out once per label and reused until it changes
+        self.layout_text = None
+        self.text_pos = None
+        self.in_conflict = False
         self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsSelectable, True)
         self.setAcceptedMouseButtons(Qt.MouseButton.LeftButton)
         self.setAcceptHoverEvents(True)
 
     def boundingRect(self):
-        return QRectF(-self.cell_size / 2, -self.cell_size / 2, self.cell_size, self.cell_size)
+        return self.style.rect
+
+    def set_cell_size(self, cell_size):
+        if cell_size != self.cell_size:
+            self.prepareGeometryChange()
+            self.cell_size = cell_size
+            self.style = CellStyle.for_size(cell_size)
+            self.layout_text = None
         
     def paint(self, painter, option, widget=None):
+        style = self.style
         painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-        pen = QPen(Qt.GlobalColor.black, 1.5)
-        painter.setPen(pen)
-        painter.setBrush(QBrush(self.display_color))
-        rect = self.boundingRect()
-        painter.drawRoundedRect(rect, 10, 10)
-
-        display_text = self.selected_color_name or ""
-        painter.setPen(QPen(Qt.GlobalColor.black))
-        font = QFont("Segoe UI", int(self.cell_size * 0.2), QFont.Weight.Medium)
-        painter.setFont(font)
-        metrics = QFontMetrics(font)
-        text_width = metrics.horizontalAdvance(display_text)
-        painter.drawText(QPointF(-text_width / 2, 5), display_text)
+        painter.setPen(style.conflict_pen if self.in_conflict else style.border_pen)
+        painter.setBrush(style.brush(self.display_color))
+        painter.drawRoundedRect(style.rect, 10, 10)
+
+        display_text = self.selected_color_name
+        if not display_text:
+            return
+        if display_text != self.layout_text:
+            self.layout_text = display_text
+            self.text_pos = QPointF(-style.text_width(display_text) / 2, 5)
+        painter.setPen(style.text_pen)
+        painter.setFont(style.font)
+        painter.drawText(self.text_pos, display_text)
 
     def mousePressEvent(self, event):
         if event.button() == Qt.MouseButton.LeftButton:
@@ -78,37 +147,63 @@ class ColorCell(QGraphicsItem):
             self.start_flash()
 
     def start_flash(self):
-        if not self.timer.isActive():
-            self.toggle_state = False
-            self.timer.start(100)
+        self.parent_window.flash_animator.add(self)
 
     def stop_flash(self):
-        if self.timer.isActive():
-            self.timer.stop()
+        if self.parent_window.flash_animator.remove(self):
             self.display_color = QColor(self.get_color_rgb(self.original_color_name))
             self.update()
 
-    def toggle_flash_color(self):
-        if self.toggle_state:
-            self.display_color = QColor("#2205FF")
-        else:
-            self.display_color = QColor("#FF00FB")
-        self.toggle_state = not self.toggle_state
-        self.update()
-
     def get_color_rgb(self, color_name):
-        color_map = {
-            "red": "#FF0000",
-            "orange": "#FFA500",
-            "yellow": "#FFFF00",
-            "green": "#00FF00", 
-            "blue": "#0000FF", 
-            "purple": "#800080",
-            "black": "#000000", 
-            "white": "#FFFFFF", 
-            "brown": "#8B4513",
-        }
-        return color_map.get(color_name.lower(), "#ADD8E6")
+        return COLOR_MAP.get(color_name.lower(), "#ADD8E6")
+
+class FlashAnimator:
+    """Drives the flash of every wrong cell from one timer and one scene update per tick"""
+    FLASH_COLORS = (QColor("#FF00FB"), QColor("#2205FF"))
+
+    def __init__(self, scene, interval=100):
+        self.scene = scene
+        self.cells = set()
+        self.phase = 0
+        self.dirty_rect = None
+        self.timer = QTimer()
+        self.timer.setInterval(interval)
+        self.timer.timeout.connect(self.tick)
+
+    def add(self, cell):
+        if cell not in self.cells:
+            self.cells.add(cell)
+            cell.display_color = self.FLASH_COLORS[self.phase]
+            self.dirty_rect = None
+            if not self.timer.isActive():
+                self.timer.start()
+
+    def remove(self, cell):
+        """Stop flashing cell; returns False if it was not flashing"""
+        if cell not in self.cells:
+            return False
+        self.cells.discard(cell)
+        self.dirty_rect = None
+        if not self.cells:
+            self.timer.stop()
+        return True
+
+    def clear(self):
+        self.cells.clear()
+        self.dirty_rect = None
+        self.timer.stop()
+
+    def tick(self):
+        self.phase ^= 1
+        color = self.FLASH_COLORS[self.phase]
+        for cell in self.cells:
+            cell.display_color = color
+        if self.dirty_rect is None:
+            self.dirty_rect = QRectF()
+            for cell in self.cells:
+                self.dirty_rect = self.dirty_rect.united(cell.sceneBoundingRect())
+        self.scene.update(self.dirty_rect)
+
 
 class TimeUpdater:
     def __init__(self, label):
@@ -122,6 +217,568 @@ class TimeUpdater:
         current_time = time.strftime("%I:%M:%S %p +07, %B %d, %Y", time.localtime())
         self.label.setText(f"CSP Color Matching Game - {current_time}")
 
+class GridColoringCSP:
+    """Grid-coloring CSP with bitset domains.
+
+    Constraints: 4-neighbour cells must differ (optional) and groups of cells
+    (rows, columns) must contain exactly the quota of each color.
+    """
+    def __init__(self, rows, cols, colors, adjacent_differ=True, row_quotas=None, col_quotas=None):
+        self.rows = rows
+        self.cols = cols
+        self.colors = list(colors)
+        self.full = (1 << len(self.colors)) - 1
+        n = rows * cols
+        self.neighbors = [[] for _ in range(n)]
+        if adjacent_differ:
+            for i in range(rows):
+                for j in range(cols):
+                    cell = i * cols + j
+                    if j + 1 < cols:
+                        self.neighbors[cell].append(cell + 1)
+                        self.neighbors[cell + 1].append(cell)
+                    if i + 1 < rows:
+                        self.neighbors[cell].append(cell + cols)
+                        self.neighbors[cell + cols].append(cell)
+        self.groups = []
+        self.quotas = []
+        self.cell_groups = [[] for _ in range(n)]
+        for i, quota in enumerate(row_quotas or []):
+            self.add_group([i * cols + j for j in range(cols)], quota)
+        for j, quota in enumerate(col_quotas or []):
+            self.add_group([i * cols + j for i in range(rows)], quota)
+        self.stats = {}
+
+    @classmethod
+    def from_target(cls, grid, colors, col_quotas=False):
+        """Model a target grid: per-row color quotas, plus 'neighbours differ' if the target obeys it"""
+        rows, cols = len(grid), len(grid[0])
+        index = {c: k for k, c in enumerate(colors)}
+        adjacent_differ = all(
+            (j + 1 >= cols or grid[i][j] != grid[i][j + 1]) and (i + 1 >= rows or grid[i][j] != grid[i + 1][j])
+            for i in range(rows) for j in range(cols))
+        row_counts = [[0] * len(colors) for _ in range(rows)]
+        col_counts = [[0] * len(colors) for _ in range(cols)]
+        for i in range(rows):
+            for j in range(cols):
+                row_counts[i][index[grid[i][j]]] += 1
+                col_counts[j][index[grid[i][j]]] += 1
+        return cls(rows, cols, colors, adjacent_differ, row_counts, col_counts if col_quotas else None)
+
+    def add_group(self, cells, quota):
+        g = len(self.groups)
+        self.groups.append(cells)
+        self.quotas.append(list(quota))
+        for cell in cells:
+            self.cell_groups[cell].append(g)
+
+    def violations(self, grid):
+        """Count broken constraints in a (possibly partial) grid of color names or None"""
+        flat = [c for row in grid for c in row]
+        count = 0
+        for cell, color in enumerate(flat):
+            if color is not None:
+                count += sum(1 for nb in self.neighbors[cell] if nb > cell and flat[nb] == color)
+        index = {c: k for k, c in enumerate(self.colors)}
+        for cells, quota in zip(self.groups, self.quotas):
+            counts = [0] * len(self.colors)
+            complete = True
+            for cell in cells:
+                if flat[cell] in index:
+                    counts[index[flat[cell]]] += 1
+                else:
+                    complete = False
+            for have, want in zip(counts, quota):
+                count += abs(have - want) if complete else max(0, have - want)
+        return count
+
+    # Domain bookkeeping: every domain change goes through _set so the group
+    # support/fixed counters and the undo trail stay in sync
+    def _account(self, cell, old, new):
+        for g in self.cell_groups[cell]:
+            support, fixed = self.support[g], self.fixed[g]
+            changed = old ^ new
+            while changed:
+                bit = changed & -changed
+                changed ^= bit
+                support[bit.bit_length() - 1] += 1 if new & bit else -1
+            if old and old & (old - 1) == 0:
+                fixed[old.bit_length() - 1] -= 1
+            if new and new & (new - 1) == 0:
+                fixed[new.bit_length() - 1] += 1
+
+    def _set(self, cell, new):
+        old = self.domains[cell]
+        if new == old:
+            return True
+        self.trail.append((cell, old))
+        self.domains[cell] = new
+        self._account(cell, old, new)
+        self._push(cell, new)
+        self.queue.append(cell)
+        return new != 0
+
+    def _undo(self, mark):
+        while len(self.trail) > mark:
+            cell, old = self.trail.pop()
+            self._account(cell, self.domains[cell], old)
+            self.domains[cell] = old
+            self._push(cell, old)
+
+    def _check_group(self, g):
+        support, fixed, quota = self.support[g], self.fixed[g], self.quotas[g]
+        for v, want in enumerate(quota):
+            if fixed[v] > want or support[v] < want:
+                return False
+            bit = 1 << v
+            if fixed[v] == want and support[v] > want:
+                # Quota met: no other cell in the group may take this color
+                for cell in self.groups[g]:
+                    d = self.domains[cell]
+                    if d & bit and d != bit and not self._set(cell, d & ~bit):
+                        return False
+            elif support[v] == want and fixed[v] < want:
+                # Every remaining candidate is needed to reach the quota
+                for cell in self.groups[g]:
+                    d = self.domains[cell]
+                    if d & bit and d != bit and not self._set(cell, bit):
+                        return False
+        return True
+
+    def _propagate(self):
+        """AC-3 style queue: revise neighbours of decided cells and re-check touched groups"""
+        queue = self.queue
+        while queue:
+            cell = queue.pop()
+            self.stats["propagations"] += 1
+            d = self.domains[cell]
+            if not d:
+                queue.clear()
+                return False
+            if d & (d - 1) == 0:
+                for nb in self.neighbors[cell]:
+                    if self.domains[nb] & d and not self._set(nb, self.domains[nb] & ~d):
+                        queue.clear()
+                        return False
+            for g in self.cell_groups[cell]:
+                if not self._check_group(g):
+                    queue.clear()
+                    return False
+        return True
+
+    def _select(self):
+        """MRV with degree tie-break; None when every domain is a singleton"""
+        # Lazy heap of (domain size, -degree, cell); entries that no longer
+        # match the cell's domain are dropped when they reach the top
+        heap, domains = self.heap, self.domains
+        while heap:
+            size, _, cell = heap[0]
+            d = domains[cell]
+            if d & (d - 1) and d.bit_count() == size:
+                return cell
+            heapq.heappop(heap)
+        return None
+
+    def _push(self, cell, d):
+        if d & (d - 1):
+            if len(self.heap) > self.heap_limit:
+                self._rebuild_heap()
+            heapq.heappush(self.heap, (d.bit_count(), -self.degree[cell], cell))
+
+    def _rebuild_heap(self):
+        """Drop stale entries so the heap stays O(cells) however long the search runs"""
+        self.heap = [(d.bit_count(), -self.degree[cell], cell)
+                     for cell, d in enumerate(self.domains) if d & (d - 1)]
+        heapq.heapify(self.heap)
+
+    def solve(self, fixed=None, rng=None, max_nodes=None, should_stop=None):
+        """Solve with the given {(i, j): color} cells fixed.
+
+        Returns a grid of color names or None; search statistics go to self.stats,
+        where "aborted" means max_nodes ran out or should_stop() returned True.
+        """
+        start = time.perf_counter()
+        k = len(self.colors)
+        n = self.rows * self.cols
+        self.stats = {"nodes": 0, "backtracks": 0, "propagations": 0, "aborted": False}
+        self.domains = [self.full] * n
+        self.support = [[len(cells)] * k for cells in self.groups]
+        self.fixed = [[0] * k for _ in self.groups]
+        if k == 1:
+            for g in range(len(self.groups)):
+                self.fixed[g][0] = len(self.groups[g])
+        self.trail = []
+        self.queue = list(range(n))
+        self.degree = [len(self.neighbors[cell]) + len(self.cell_groups[cell]) for cell in range(n)]
+        self.heap = []
+        self.heap_limit = 4 * n + 64
+        for cell in range(n):
+            self._push(cell, self.full)
+        result = None
+        ok = True
+        index = {c: v for v, c in enumerate(self.colors)}
+        for (i, j), color in (fixed or {}).items():
+            if color not in index or not self._set(i * self.cols + j, self.domains[i * self.cols + j] & (1 << index[color])):
+                ok = False
+        if ok and self._propagate():
+            result = self._search(rng, max_nodes, should_stop)
+        self.stats["seconds"] = time.perf_counter() - start
+        return result
+
+    def _values(self, d, rng):
+        bits = []
+        while d:
+            bit = d & -d
+            d ^= bit
+            bits.append(bit)
+        if rng is not None:
+            rng.shuffle(bits)
+        return bits
+
+    def _search(self, rng, max_nodes, should_stop):
+        # Explicit stack so grids with thousands of cells do not hit the recursion limit
+        stack = []
+        while True:
+            cell = self._select()
+            if cell is None:
+                names = [self.colors[d.bit_length() - 1] for d in self.domains]
+                return [names[i * self.cols:(i + 1) * self.cols] for i in range(self.rows)]
+            stack.append((cell, self._values(self.domains[cell], rng), len(self.trail)))
+            while stack:
+                cell, values, mark = stack[-1]
+                self._undo(mark)
+                self.queue.clear()
+                if not values:
+                    stack.pop()
+                    self.stats["backtracks"] += 1
+                    continue
+                if max_nodes is not None and self.stats["nodes"] >= max_nodes:
+                    self.stats["aborted"] = True
+                    return None
+                if should_stop is not None and self.stats["nodes"] % 1024 == 0 and should_stop():
+                    self.stats["aborted"] = True
+                    return None
+                self.stats["nodes"] += 1
+                bit = values.pop()
+                if self._set(cell, bit) and self._propagate():
+                    break
+            else:
+                return None
+
+
+class MinConflictsSolver:
+    """Min-conflicts local search with a tabu list over a GridColoringCSP.
+
+    Cost is the number of clashing neighbour pairs plus the total distance of
+    every group from its quotas; all counts are updated incrementally per move.
+    """
+    def __init__(self, csp, max_steps=500000, tabu_tenure=10, noise=0.02, rng=None):
+        self.csp = csp
+        self.max_steps = max_steps
+        self.tabu_tenure = tabu_tenure
+        self.noise = noise
+        self.rng = rng or random.Random()
+        self.stats = {}
+
+    # Indexed sets give O(1) add/remove and O(1) random choice
+    @staticmethod
+    def _add(items, pos, x):
+        if x not in pos:
+            pos[x] = len(items)
+            items.append(x)
+
+    @staticmethod
+    def _remove(items, pos, x):
+        i = pos.pop(x, None)
+        if i is not None:
+            last = items.pop()
+            if i < len(items):
+                items[i] = last
+                pos[last] = i
+
+    def _group_penalty(self, g):
+        return sum(abs(have - want) for have, want in zip(self.group_count[g], self.csp.quotas[g]))
+
+    def _delta(self, cell, new):
+        old = self.assign[cell]
+        k = self.k
+        delta = self.nb_count[cell * k + new] - (self.nb_count[cell * k + old] if old >= 0 else 0)
+        for g in self.csp.cell_groups[cell]:
+            count, quota = self.group_count[g], self.csp.quotas[g]
+            if old >= 0:
+                delta += abs(count[old] - 1 - quota[old]) - abs(count[old] - quota[old])
+            delta += abs(count[new] + 1 - quota[new]) - abs(count[new] - quota[new])
+        return delta
+
+    def _move(self, cell, new):
+        csp, k = self.csp, self.k
+        old = self.assign[cell]
+        self.cost += self._delta(cell, new)
+        self.assign[cell] = new
+        for nb in csp.neighbors[cell]:
+            if old >= 0:
+                self.nb_count[nb * k + old] -= 1
+            self.nb_count[nb * k + new] += 1
+        for x in (cell, *csp.neighbors[cell]):
+            if self.assign[x] >= 0 and not self.is_fixed[x] and self.nb_count[x * k + self.assign[x]]:
+                self._add(self.clashing, self.clashing_pos, x)
+            else:
+                self._remove(self.clashing, self.clashing_pos, x)
+        for g in csp.cell_groups[cell]:
+            if old >= 0:
+                self.group_count[g][old] -= 1
+            self.group_count[g][new] += 1
+            if self._group_penalty(g):
+                self._add(self.bad_groups, self.bad_groups_pos, g)
+            else:
+                self._remove(self.bad_groups, self.bad_groups_pos, g)
+        self.changes[cell] = new
+
+    def _pick_cell(self):
+        rng = self.rng
+        if self.clashing and (not self.bad_groups or rng.random() < 0.5):
+            return rng.choice(self.clashing)
+        if self.bad_groups:
+            g = rng.choice(self.bad_groups)
+            count, quota = self.group_count[g], self.csp.quotas[g]
+            over = [cell for cell in self.csp.groups[g]
+                    if not self.is_fixed[cell] and count[self.assign[cell]] > quota[self.assign[cell]]]
+            if over:
+                return rng.choice(over)
+        return None
+
+    def solve(self, fixed=None, on_progress=None, should_stop=None, progress_every=2000):
+        """Search from a greedy start; returns a grid of color names or None.
+
+        on_progress(changes, cost, step) receives the {cell: color index} moves made
+        since the previous call; should_stop() is polled at the same interval.
+        """
+        start = time.perf_counter()
+        csp, rng = self.csp, self.rng
+        k = self.k = len(csp.colors)
+        n = csp.rows * csp.cols
+        index = {c: v for v, c in enumerate(csp.colors)}
+        self.assign = [-1] * n
+        self.is_fixed = [False] * n
+        self.nb_count = [0] * (n * k)
+        self.group_count = [[0] * k for _ in csp.groups]
+        self.clashing, self.clashing_pos = [], {}
+        self.bad_groups, self.bad_groups_pos = [], {}
+        self.changes = {}
+        self.cost = sum(sum(quota) for quota in csp.quotas)
+        self.stats = {"steps": 0, "best_cost": None, "aborted": False}
+
+        for (i, j), color in (fixed or {}).items():
+            cell = i * csp.cols + j
+            self.is_fixed[cell] = True
+            self._move(cell, index[color])
+        # Greedy start: each free cell takes its least conflicting color
+        order = [cell for cell in range(n) if not self.is_fixed[cell]]
+        rng.shuffle(order)
+        for cell in order:
+            deltas = [self._delta(cell, v) for v in range(k)]
+            best = min(deltas)
+            self._move(cell, rng.choice([v for v in range(k) if deltas[v] == best]))
+
+        best_cost = self.cost
+        tabu = {}
+        step = 0
+        while self.cost > 0 and step < self.max_steps:
+            step += 1
+            if step % progress_every == 0:
+                if on_progress is not None:
+                    on_progress(self.changes, self.cost, step)
+                    self.changes = {}
+                if should_stop is not None and should_stop():
+                    self.stats["aborted"] = True
+                    break
+            cell = self._pick_cell()
+            if cell is None:
+                break
+            current = self.assign[cell]
+            if rng.random() < self.noise:
+                choice = rng.randrange(k)
+            else:
+                choice, choice_delta, ties = None, None, 0
+                for v in range(k):
+                    if v == current:
+                        continue
+                    delta = self._delta(cell, v)
+                    # Tabu moves are allowed only if they beat the best cost so far
+                    if tabu.get(cell * k + v, 0) > step and self.cost + delta >= best_cost:
+                        continue
+                    if choice_delta is None or delta < choice_delta:
+                        choice, choice_delta, ties = v, delta, 1
+                    elif delta == choice_delta:
+                        ties += 1
+                        if rng.randrange(ties) == 0:
+                            choice = v
+                if choice is None:
+                    continue
+            if choice == current:
+                continue
+            tabu[cell * k + current] = step + self.tabu_tenure
+            self._move(cell, choice)
+            best_cost = min(best_cost, self.cost)
+
+        if on_progress is not None and self.changes:
+            on_progress(self.changes, self.cost, step)
+            self.changes = {}
+        self.stats.update(steps=step, best_cost=best_cost, cost=self.cost, seconds=time.perf_counter() - start)
+        if self.cost:
+            return None
+        names = [csp.colors[v] for v in self.assign]
+        return [names[i * csp.cols:(i + 1) * csp.cols] for i in range(csp.rows)]
+
+
+PORTFOLIO_STRATEGIES = ("backtracking-ac3", "min-conflicts", "random-restarts")
+PORTFOLIO_STATS_FILE = "portfolio_stats.json"
+
+
+def run_strategy(name, csp, fixed, seed, results):
+    """Worker process entry point: solve with one strategy and report (name, solution, seconds, exhausted)"""
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    exhausted = False
+    if name == "backtracking-ac3":
+        solution = csp.solve(fixed)
+        exhausted = solution is None
+    elif name == "min-conflicts":
+        solution = None
+        while solution is None:
+            solution = MinConflictsSolver(csp, rng=rng).solve(fixed)
+    else:
+        # Randomized value order with a geometrically growing node budget
+        max_nodes = 100
+        while True:
+            solution = csp.solve(fixed, rng=rng, max_nodes=max_nodes)
+            if solution is not None or not csp.stats["aborted"]:
+                exhausted = solution is None
+                break
+            max_nodes = int(max_nodes * 1.5)
+    results.put((name, solution, time.perf_counter() - start, exhausted))
+
+
+def record_portfolio_win(name, seconds, path=PORTFOLIO_STATS_FILE):
+    """Count wins per strategy so the default backend can be tuned"""
+    stats = {}
+    if os.path.exists(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                stats = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Could not read portfolio stats: {e}")
+    entry = stats.setdefault(name, {"wins": 0, "total_seconds": 0.0})
+    entry["wins"] += 1
+    entry["total_seconds"] += seconds
+    try:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(stats, f, indent=2)
+    except OSError as e:
+        logging.warning(f"Could not save portfolio stats: {e}")
+
+
+def solve_portfolio(csp, fixed=None, strategies=PORTFOLIO_STRATEGIES, timeout=None, should_stop=None):
+    """Race strategies in separate processes; the first solution wins and the rest are terminated.
+
+    Returns (outcome, winner): outcome is "solved", "stopped", "timeout", "unsolvable"
+    (backtracking exhausted the search) or "failed" (every worker exited without a
+    solution); winner is (strategy, solution, seconds) when solved, else None.
+    """
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    seed = random.randrange(2**31)
+    processes = [ctx.Process(target=run_strategy, args=(name, csp, fixed, seed + k, results), daemon=True)
+                 for k, name in enumerate(strategies)]
+    for process in processes:
+        process.start()
+    deadline = None if timeout is None else time.monotonic() + timeout
+    winner = None
+    outcome = "failed"
+    pending = len(processes)
+    try:
+        while pending:
+            try:
+                name, solution, seconds, exhausted = results.get(timeout=0.1)
+            except queue.Empty:
+                if should_stop is not None and should_stop():
+                    outcome = "stopped"
+                    break
+                if deadline is not None and time.monotonic() > deadline:
+                    outcome = "timeout"
+                    break
+                if not any(process.is_alive() for process in processes) and results.empty():
+                    break
+                continue
+            pending -= 1
+            if solution is not None:
+                winner = (name, solution, seconds)
+                outcome = "solved"
+                break
+            if exhausted:
+                logging.debug(f"Portfolio: {name} proved there is no solution")
+                outcome = "unsolvable"
+                break
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+            process.join()
+    if winner is not None:
+        logging.debug(f"Portfolio winner: {winner[0]} in {winner[2]:.3f}s")
+        record_portfolio_win(winner[0], winner[2])
+    return outcome, winner
+
+
+class PortfolioWorker(QThread):
+    """Waits on solve_portfolio off the GUI thread"""
+    solved = pyqtSignal(str, object)
+
+    def __init__(self, csp, fixed):
+        super().__init__()
+        self.csp = csp
+        self.fixed = fixed
+
+    def run(self):
+        self.solved.emit(*solve_portfolio(self.csp, self.fixed, should_stop=self.isInterruptionRequested))
+
+
+class BacktrackingWorker(QThread):
+    """Runs GridColoringCSP.solve off the GUI thread within a node and time budget"""
+    solved = pyqtSignal(object)
+
+    def __init__(self, csp, fixed, max_nodes=200000, time_budget=30.0):
+        super().__init__()
+        self.csp = csp
+        self.fixed = fixed
+        self.max_nodes = max_nodes
+        self.time_budget = time_budget
+
+    def run(self):
+        deadline = time.monotonic() + self.time_budget
+
+        def should_stop():
+            return self.isInterruptionRequested() or time.monotonic() > deadline
+
+        self.solved.emit(self.csp.solve(self.fixed, max_nodes=self.max_nodes, should_stop=should_stop))
+
+
+class LocalSearchWorker(QThread):
+    """Runs MinConflictsSolver off the GUI thread and streams the moves it makes"""
+    progress = pyqtSignal(object, int, int)
+    solved = pyqtSignal(object)
+
+    def __init__(self, csp, fixed):
+        super().__init__()
+        self.solver = MinConflictsSolver(csp)
+        self.fixed = fixed
+
+    def run(self):
+        solution = self.solver.solve(self.fixed, on_progress=self.progress.emit,
+                                     should_stop=self.isInterruptionRequested)
+        self.solved.emit(solution)
+
+
 class ColorMatchingWindow(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -134,6 +791,12 @@ class ColorMatchingWindow(QMainWindow):
         self.init_colors = []
         self.user_grid = []
         self.cells = []
+        self.csp = None
+        self.search_worker = None
+        self.relayout_timer = QTimer(self)
+        self.relayout_timer.setSingleShot(True)
+        self.relayout_timer.setInterval(150)
+        self.relayout_timer.timeout.connect(self.layout_cells)
 
         self.setStyleSheet("""
             QLabel#HeaderLabel {
@@ -183,6 +846,7 @@ class ColorMatchingWindow(QMainWindow):
     
 
         self.scene = QGraphicsScene()
+        self.flash_animator = FlashAnimator(self.scene)
         self.view = QGraphicsView(self.scene)
         self.view.setRenderHint(QPainter.RenderHint.Antialiasing)
         layout.addWidget(self.view)
@@ -197,8 +861,15 @@ class ColorMatchingWindow(QMainWindow):
         self.new_game_btn = QPushButton("New Game")
         self.new_game_btn.clicked.connect(self.new_game)
         self.new_game_btn.setEnabled(False)
+        self.solve_btn = QPushButton("Auto-solve")
+        self.solve_btn.clicked.connect(self.auto_solve)
+        self.solve_btn.setEnabled(False)
+        self.backend_combo = QComboBox()
+        self.backend_combo.addItems(["Backtracking (AC-3)", "Min-conflicts", "Portfolio"])
         button_layout.addStretch()
         button_layout.addWidget(self.check_btn)
+        button_layout.addWidget(self.solve_btn)
+        button_layout.addWidget(self.backend_combo)
         button_layout.addWidget(self.clear_btn)
         button_layout.addWidget(self.new_game_btn)
         button_layout.addStretch()
@@ -208,9 +879,18 @@ class ColorMatchingWindow(QMainWindow):
         self.status_label.setObjectName("StatusLabel")
         layout.addWidget(self.status_label)
 
+        self.score_label = QLabel("")
+        self.score_label.setObjectName("StatusLabel")
+        layout.addWidget(self.score_label)
+
     def resizeEvent(self, event):
         super().resizeEvent(event)
-        self.generate_game()
+        if not self.cells:
+            return
+        # Scale the existing scene while the user drags, and lay the cells out
+        # again only once the size has settled
+        self.view.fitInView(self.scene.sceneRect(), Qt.AspectRatioMode.KeepAspectRatio)
+        self.relayout_timer.start()
 
     def show_admin_dialog(self):
         dialog = AdminDialog(self.colors or ["red", "orange", "yellow", "green", 
@@ -219,40 +899,256 @@ class ColorMatchingWindow(QMainWindow):
         if dialog.exec():
             self.status_label.setText("Grid generate. Click cells to select colors.")
             self.check_btn.setEnabled(True)
+            self.solve_btn.setEnabled(True)
             self.clear_btn.setEnabled(True)
             self.new_game_btn.setEnabled(True)
     
             
     def generate_game(self):
+        """Create the cells for a new grid, keeping any selections already in user_grid"""
         if not self.init_colors:
             return
+        self.flash_animator.clear()
         self.scene.clear()
+        self.cells = [[None for _ in range(self.size)] for _ in range(self.size)]
+        for i in range(self.size):
+            for j in range(self.size):
+                cell = ColorCell(self.init_colors[i][j], self.colors, self, i, j, 1)
+                cell.selected_color_name = self.user_grid[i][j]
+                self.scene.addItem(cell)
+                self.cells[i][j] = cell
+        self.reset_tracking()
+        self.layout_cells()
+
+    def layout_cells(self):
+        """Fit the existing cells to the viewport by resizing and moving them in place"""
+        if not self.cells:
+            return
+        self.view.resetTransform()
         view_width = self.view.viewport().width()
         view_height = self.view.viewport().height()
         available_size = min(view_width, view_height)
-        spacing = 10
+        spacing = min(10, available_size / (self.size * 8))
         total_spacing = spacing * (self.size + 1)
-        cell_size = (available_size - total_spacing) / self.size
+        cell_size = max(1, (available_size - total_spacing) / self.size)
 
         total_grid_width = self.size * (cell_size + spacing)
         total_grid_height = self.size * (cell_size + spacing)
         x_offset = (view_width - total_grid_width) / 2 + cell_size / 2
         y_offset = (view_height - total_grid_height) /2 + cell_size / 2
-        
-        self.cells = [[None for _ in range(self.size)] for _ in range(self.size)]
+
         for i in range(self.size):
             for j in range(self.size):
-                cell = ColorCell(self.init_colors[i][j], self.colors, self, i, j, cell_size)
-                x = j * (cell_size + spacing) + x_offset
-                y = i * (cell_size + spacing) + y_offset
-                cell.setPos(x, y)
-                self.scene.addItem(cell)
-                self.cells[i][j] = cell
-                self.user_grid[i][j] = None
+                cell = self.cells[i][j]
+                cell.set_cell_size(cell_size)
+                cell.setPos(j * (cell_size + spacing) + x_offset, i * (cell_size + spacing) + y_offset)
+        self.flash_animator.dirty_rect = None
         self.scene.setSceneRect(0, 0, view_width, view_height)
 
-    def update_cell(self, i, j, selected_color_name):
-        self.user_grid[i][j] = selected_color_name
+    def reset_tracking(self):
+        """Recount matches and conflicts from scratch; afterwards update_cell keeps them current"""
+        csp = self.get_csp()
+        n = self.size * self.size
+        self.color_index = {c: v for v, c in enumerate(csp.colors)}
+        self.matched = 0
+        self.unmatched = 0
+        self.clashes = [0] * n
+        self.conflicting = 0
+        self.group_counts = [[0] * len(csp.colors) for _ in csp.groups]
+        self.over_quota = [0] * len(csp.groups)
+        grid = self.user_grid
+        self.user_grid = [[None] * self.size for _ in range(self.size)]
+        for i in range(self.size):
+            for j in range(self.size):
+                self.cells[i][j].in_conflict = False
+                if grid[i][j] is not None:
+                    self.update_cell(i, j, grid[i][j], refresh=False)
+        self.refresh_score()
+
+    def update_cell(self, i, j, selected_color_name, refresh=True):
+        """Record a selection and update the running score and conflict counts in O(1)"""
+        old = self.user_grid[i][j]
+        new = selected_color_name
+        self.user_grid[i][j] = new
+        if old == new:
+            return
+        target = self.init_colors[i][j]
+        if old is not None:
+            if old == target:
+                self.matched -= 1
+            else:
+                self.unmatched -= 1
+        if new is not None:
+            if new == target:
+                self.matched += 1
+            else:
+                self.unmatched += 1
+
+        csp = self.csp
+        cell = i * self.size + j
+        for nb in csp.neighbors[cell]:
+            other = self.user_grid[nb // self.size][nb % self.size]
+            if other is None:
+                continue
+            if other == old:
+                self._add_clash(cell, -1)
+                self._add_clash(nb, -1)
+            if other == new:
+                self._add_clash(cell, 1)
+                self._add_clash(nb, 1)
+        for g in csp.cell_groups[cell]:
+            counts, quota = self.group_counts[g], csp.quotas[g]
+            for color, step in ((old, -1), (new, 1)):
+                v = self.color_index.get(color)
+                if v is not None:
+                    before = max(0, counts[v] - quota[v])
+                    counts[v] += step
+                    self.over_quota[g] += max(0, counts[v] - quota[v]) - before
+        if refresh:
+            self.refresh_score()
+
+    def _add_clash(self, cell, step):
+        self.clashes[cell] += step
+        in_conflict = self.clashes[cell] > 0
+        item = self.cells[cell // self.size][cell % self.size]
+        if item.in_conflict != in_conflict:
+            item.in_conflict = in_conflict
+            self.conflicting += 1 if in_conflict else -1
+            item.update()
+
+    def refresh_score(self):
+        total = self.size * self.size
+        over_groups = sum(1 for amount in self.over_quota if amount)
+        self.score_label.setText(
+            f"Score: {self.matched} / {total}  |  Wrong: {self.unmatched}  |  "
+            f"Empty: {total - self.matched - self.unmatched}  |  "
+            f"Conflicting cells: {self.conflicting}  |  Rows over quota: {over_groups}")
+
+    def get_csp(self):
+        """Constraint model of the admin's target grid, built once per game"""
+        if self.csp is None:
+            palette = self.colors + sorted({c for row in self.init_colors for c in row} - set(self.colors))
+            self.csp = GridColoringCSP.from_target(self.init_colors, palette)
+        return self.csp
+
+    def auto_solve(self):
+        """Complete the grid from the user's picks with the selected solver backend"""
+        csp = self.get_csp()
+        fixed = {(i, j): self.user_grid[i][j] for i in range(self.size) for j in range(self.size)
+                 if self.user_grid[i][j] is not None}
+        if self.backend_combo.currentText() == "Min-conflicts":
+            self.start_local_search(csp, fixed)
+            return
+        if self.backend_combo.currentText() == "Portfolio":
+            self.start_portfolio(csp, fixed)
+            return
+        self.start_backtracking(csp, fixed)
+
+    def apply_solution(self, solution):
+        for i in range(self.size):
+            for j in range(self.size):
+                self.cells[i][j].selected_color_name = solution[i][j]
+                self.update_cell(i, j, solution[i][j], refresh=False)
+        self.refresh_score()
+        self.scene.update()
+
+    def start_backtracking(self, csp, fixed):
+        if self.search_worker is not None:
+            self.search_worker.requestInterruption()
+            return
+        self.search_worker = BacktrackingWorker(csp, fixed)
+        self.search_worker.solved.connect(self.backtracking_done)
+        self.search_worker.finished.connect(self.search_worker.deleteLater)
+        self.set_searching(True)
+        self.status_label.setText("Backtracking with AC-3...")
+        self.search_worker.start()
+
+    def backtracking_done(self, solution):
+        stats = self.search_worker.csp.stats
+        self.search_worker = None
+        self.set_searching(False)
+        summary = (f"{stats['nodes']} nodes, {stats['backtracks']} backtracks, "
+                   f"{stats['propagations']} propagations in {stats['seconds']:.3f}s")
+        logging.debug(f"CSP solve: {summary}")
+        if solution is not None:
+            self.apply_solution(solution)
+            self.status_label.setText(f"Auto-solved: {summary}.")
+        elif stats["aborted"]:
+            self.status_label.setText(f"Backtracking aborted: {summary}.")
+        else:
+            self.status_label.setText(f"No completion satisfies the constraints with your picks ({summary}).")
+
+    def set_searching(self, searching):
+        """Lock out regenerating the grid while a worker is still writing moves into it"""
+        self.solve_btn.setText("Stop" if searching else "Auto-solve")
+        self.admin_btn.setEnabled(not searching)
+        self.new_game_btn.setEnabled(not searching)
+        self.clear_btn.setEnabled(not searching)
+
+    def start_local_search(self, csp, fixed):
+        if self.search_worker is not None:
+            # A second click stops the running search
+            self.search_worker.requestInterruption()
+            return
+        self.search_worker = LocalSearchWorker(csp, fixed)
+        self.search_worker.progress.connect(self.show_search_progress)
+        self.search_worker.solved.connect(self.local_search_done)
+        self.search_worker.finished.connect(self.search_worker.deleteLater)
+        self.set_searching(True)
+        self.search_worker.start()
+
+    def start_portfolio(self, csp, fixed):
+        if self.search_worker is not None:
+            self.search_worker.requestInterruption()
+            return
+        self.search_worker = PortfolioWorker(csp, fixed)
+        self.search_worker.solved.connect(self.portfolio_done)
+        self.search_worker.finished.connect(self.search_worker.deleteLater)
+        self.set_searching(True)
+        self.status_label.setText(f"Racing {', '.join(PORTFOLIO_STRATEGIES)}...")
+        self.search_worker.start()
+
+    def portfolio_done(self, outcome, result):
+        self.search_worker = None
+        self.set_searching(False)
+        if result is None:
+            self.status_label.setText({
+                "stopped": "Portfolio stopped.",
+                "timeout": "Portfolio timed out before any strategy finished.",
+                "unsolvable": "No completion satisfies the constraints with your picks (proved by backtracking).",
+            }.get(outcome, "Portfolio strategies all exited without a solution."))
+            return
+        name, solution, seconds = result
+        self.apply_solution(solution)
+        self.status_label.setText(f"Auto-solved by {name} in {seconds:.3f}s (portfolio).")
+
+    def show_search_progress(self, changes, cost, step):
+        colors = self.get_csp().colors
+        for cell, v in changes.items():
+            i, j = divmod(cell, self.size)
+            self.cells[i][j].selected_color_name = colors[v]
+            self.update_cell(i, j, colors[v], refresh=False)
+        self.refresh_score()
+        self.scene.update()
+        self.status_label.setText(f"Min-conflicts: step {step}, {cost} conflicts left")
+
+    def local_search_done(self, solution):
+        stats = self.search_worker.solver.stats
+        self.search_worker = None
+        self.set_searching(False)
+        summary = f"{stats['steps']} steps in {stats['seconds']:.3f}s"
+        if solution is not None:
+            self.status_label.setText(f"Auto-solved by min-conflicts: {summary}.")
+        elif stats["aborted"]:
+            self.status_label.setText(f"Min-conflicts stopped: {summary}, {stats['cost']} conflicts left.")
+        else:
+            self.status_label.setText(f"Min-conflicts gave up: {summary}, best {stats['best_cost']} conflicts.")
+
+    def closeEvent(self, event):
+        if self.search_worker is not None:
+            self.search_worker.requestInterruption()
+            self.search_worker.wait()
+        super().closeEvent(event)
         
     def clear_grid(self):
         for i in range(self.size):
@@ -263,21 +1159,19 @@ class ColorMatchingWindow(QMainWindow):
                 cell.stop_flash()
                 cell.update()
                 self.user_grid[i][j] = None
+        self.reset_tracking()
         self.status_label.setText("Grid cleared. Click cells to select colors.")
 
     def new_game(self):
         self.show_admin_dialog()
 
     def check_csp(self):
-        consistent = True
         for i in range(self.size):
             for j in range(self.size):
-                cell = self.cells[i][j]
-                corrent_color = self.init_colors[i][j]
-                if cell.selected_color_name != corrent_color:
-                    consistent = False
-                cell.evaluate_match(corrent_color)
-        score = sum(1 for i in range(self.size) for j in range(self.size) if self.user_grid[i][j] == self.init_colors[i][j])
+                self.cells[i][j].evaluate_match(self.init_colors[i][j])
+        # Running counters from update_cell replace the second scoring pass
+        score = self.matched
+        consistent = score == self.size * self.size
 
         result_dialog = QDialog(self)
         result_dialog.setWindowTitle("CSP Matching Result")
@@ -291,59 +1185,218 @@ class ColorMatchingWindow(QMainWindow):
         score_label.setStyleSheet("font-size: 14px;")
         result_layout.addWidget(score_label)
 
+        violations_label = QLabel(f"Constraint violations: {self.get_csp().violations(self.user_grid)}")
+        violations_label.setStyleSheet("font-size: 14px;")
+        result_layout.addWidget(violations_label)
+
         close_button = QPushButton("Close")
         close_button.clicked.connect(result_dialog.accept)
         result_layout.addWidget(close_button)
         result_dialog.exec()
 
+class ColorGridModel(QAbstractTableModel):
+    """N x N grid of color names stored as compact palette indices"""
+    def __init__(self, colors, size=3, parent=None):
+        super().__init__(parent)
+        self.palette = list(colors) or ["black"]
+        self.size = size
+        self.cells = array('H', [0]) * (size * size)
+
+    def rowCount(self, parent=QModelIndex()):
+        return self.size
+
+    def columnCount(self, parent=QModelIndex()):
+        return self.size
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            return self.palette[self.cells[index.row() * self.size + index.column()]]
+        return None
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if not index.isValid() or role != Qt.ItemDataRole.EditRole:
+            return False
+        self.cells[index.row() * self.size + index.column()] = self.color_index(value)
+        self.dataChanged.emit(index, index, [role])
+        return True
+
+    def flags(self, index):
+        return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable | Qt.ItemFlag.ItemIsEditable
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole:
+            return str(section)
+        return None
+
+    def color_index(self, name):
+        if name not in self.palette:
+            self.palette.append(name)
+        return self.palette.index(name)
+
+    def set_colors(self, colors):
+        """Make colors the choices offered by the editor, keeping existing cells"""
+        names = [self.palette[v] for v in range(len(self.palette))]
+        self.beginResetModel()
+        self.palette = list(colors) + [c for c in names if c not in colors]
+        remap = array('H', (self.palette.index(name) for name in names))
+        self.cells = array('H', (remap[v] for v in self.cells))
+        self.endResetModel()
+
+    def set_grid(self, grid):
+        self.beginResetModel()
+        self.size = len(grid)
+        self.cells = array('H', (self.color_index(name) for row in grid for name in row))
+        self.endResetModel()
+
+    def resize_grid(self, size):
+        self.beginResetModel()
+        old, old_size = self.cells, self.size
+        self.size = size
+        self.cells = array('H', [0]) * (size * size)
+        for i in range(min(size, old_size)):
+            for j in range(min(size, old_size)):
+                self.cells[i * size + j] = old[i * old_size + j]
+        self.endResetModel()
+
+    def fill_random(self, colors, seed):
+        rng = random.Random(seed)
+        choices = [self.color_index(c) for c in colors]
+        self.beginResetModel()
+        self.cells = array('H', (rng.choice(choices) for _ in range(self.size * self.size)))
+        self.endResetModel()
+
+    def grid(self):
+        n = self.size
+        return [[self.palette[v] for v in self.cells[i * n:(i + 1) * n]] for i in range(n)]
+
+
+class ColorComboDelegate(QStyledItemDelegate):
+    """Creates a color combo box only for the cell being edited"""
+    def createEditor(self, parent, option, index):
+        combo = QComboBox(parent)
+        combo.addItems(index.model().palette)
+        return combo
+
+    def setEditorData(self, editor, index):
+        editor.setCurrentText(index.data(Qt.ItemDataRole.EditRole))
+
+    def setModelData(self, editor, model, index):
+        model.setData(index, editor.currentText(), Qt.ItemDataRole.EditRole)
+
+
 class AdminDialog(QDialog):
     def __init__(self, colors, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Admin Color Entry")
         self.parent = parent
-        self.resize(450, 270)
+        self.resize(600, 500)
         
         layout = QVBoxLayout(self)
         form = QFormLayout()
         self.colors_input = QLineEdit(",".join(colors))
+        self.colors_input.editingFinished.connect(lambda: self.model.set_colors(self.get_colors()))
         form.addRow("Colors (comma-separated):", self.colors_input)
+        self.size_spin = QSpinBox()
+        self.size_spin.setRange(1, 200)
+        form.addRow("Grid size (N x N):", self.size_spin)
         layout.addLayout(form)
 
-        self.init_grid = QTableWidget(3, 3)
-        self.init_grid.setHorizontalHeaderLabels(["0", "1", "2"])
-        self.init_grid.setVerticalHeaderLabels(["0", "1", "2"])
-        for i in range(3):
-            for j in range(3):
-                combo = QComboBox()
-                combo.addItems(colors)
-                self.init_grid.setCellWidget(i, j, combo)
+        # Bulk entry: paste a CSV grid or generate one from a seed
+        bulk_layout = QHBoxLayout()
+        paste_button = QPushButton("Paste CSV")
+        paste_button.clicked.connect(self.paste_csv)
+        self.seed_spin = QSpinBox()
+        self.seed_spin.setRange(0, 2**31 - 1)
+        self.seed_spin.setPrefix("Seed: ")
+        random_button = QPushButton("Random")
+        random_button.clicked.connect(self.fill_random)
+        bulk_layout.addWidget(paste_button)
+        bulk_layout.addWidget(self.seed_spin)
+        bulk_layout.addWidget(random_button)
+        layout.addLayout(bulk_layout)
+
+        self.model = ColorGridModel(colors, 3, self)
+        if parent is not None and parent.init_colors:
+            self.model.set_grid(parent.init_colors)
+        self.size_spin.setValue(self.model.size)
+        self.size_spin.valueChanged.connect(self.model.resize_grid)
+
+        self.init_grid = QTableView()
+        self.init_grid.setModel(self.model)
+        self.init_grid.setItemDelegate(ColorComboDelegate(self.init_grid))
+        self.init_grid.horizontalHeader().setDefaultSectionSize(70)
         layout.addWidget(self.init_grid)
 
         self.save_button = QPushButton("Save")
         self.save_button.clicked.connect(self.save_and_generate)
         layout.addWidget(self.save_button)
 
+    def get_colors(self):
+        return [c.strip() for c in self.colors_input.text().split(",") if c.strip()]
+
+    def paste_csv(self):
+        rows = [[c.strip() for c in line.split(",")] for line in QApplication.clipboard().text().splitlines() if line.strip()]
+        if not rows or any(len(row) != len(rows) for row in rows):
+            QMessageBox.warning(self, "Paste CSV", "Clipboard must hold an N x N comma-separated grid of color names.")
+            return
+        self.model.set_grid(rows)
+        self.size_spin.blockSignals(True)
+        self.size_spin.setValue(len(rows))
+        self.size_spin.blockSignals(False)
+
+    def fill_random(self):
+        colors = self.get_colors()
+        if not colors:
+            QMessageBox.warning(self, "Random", "Enter at least one color to pick from.")
+            return
+        self.model.fill_random(colors, self.seed_spin.value())
+
     def save_and_generate(self):
+        if self.parent.search_worker is not None:
+            QMessageBox.warning(self, "Solver running", "Stop the running solver before generating a new grid.")
+            return
         self.parent.size, self.parent.colors, self.parent.init_colors = self.get_data()
         self.parent.user_grid = [[None for _ in range(self.parent.size)] for _ in range(self.parent.size)] 
+        self.parent.csp = None
         self.parent.generate_game()
         self.accept()
         
     def get_data(self):
-        size = 3
-        colors = [c.strip() for c in self.colors_input.text().split(",") if c.strip()]
-        init_colors = []
-        for i in range(size):
-            row = []
-            for j in range(size):
-                combo = self.init_grid.cellWidget(i,j)
-                color = combo.currentText()
-                row.append(color if color in colors else "black")
-            init_colors.append(row)
-        return size, colors, init_colors
+        colors = self.get_colors()
+        init_colors = [[color if color in colors else "black" for color in row] for row in self.model.grid()]
+        return self.model.size, colors, init_colors
     
+def benchmark_paint(size=50, frames=20):
+    """Time repainting a size x size grid (half of it labelled) into an offscreen image"""
+    from PyQt6.QtGui import QImage
+    window = ColorMatchingWindow()
+    window.size = size
+    window.colors = list(COLOR_MAP)
+    window.init_colors = [[window.colors[(i + j) % len(window.colors)] for j in range(size)] for i in range(size)]
+    window.user_grid = [[None] * size for _ in range(size)]
+    window.resize(900, 900)
+    window.generate_game()
+    for i in range(size):
+        for j in range(0, size, 2):
+            window.cells[i][j].selected_color_name = window.init_colors[i][j]
+    image = QImage(900, 900, QImage.Format.Format_ARGB32_Premultiplied)
+    start = time.perf_counter()
+    for _ in range(frames):
+        painter = QPainter(image)
+        window.scene.render(painter)
+        painter.end()
+    elapsed = (time.perf_counter() - start) / frames
+    print(f"{size}x{size} grid: {elapsed * 1000:.1f} ms per frame")
+    return elapsed
+
 if __name__ == "__main__":
     app = QApplication(sys.argv)
+    if "--bench-paint" in sys.argv:
+        logging.disable(logging.DEBUG)
+        benchmark_paint()
+        sys.exit(0)
     window = ColorMatchingWindow()
     window.show()
     sys.exit(app.exec())
\ No newline at end of file
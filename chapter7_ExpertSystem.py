@@ -1,282 +1,250 @@
 import sys
-import json
 import os
+import bisect
+import argparse
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Set
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QTableWidget, QTableWidgetItem, QPushButton, QLineEdit, QTextEdit,
+    QTableView, QAbstractItemView, QPushButton, QLineEdit, QTextEdit,
     QLabel, QTabWidget, QDialog, QFormLayout, QComboBox, QMessageBox,
-    QHeaderView, QCheckBox, QSpinBox, QGroupBox, QScrollArea
+    QHeaderView, QSpinBox, QGroupBox, QListView
 )
 
 from PyQt6.QtGui import QFont
-from PyQt6.QtCore import Qt
-
-
-class TroubleshootingRule:
-    """Represents a troubleshooting rule with symptoms and solutions"""
-    def __init__(self, rule_id: str, title: str, description: str, 
-                 symptoms: List[str], solution: str, category: str, 
-                 priority: int = 1, confidence: float = 0.8):
-        self.rule_id = rule_id
-        self.title = title
-        self.description = description
-        self.symptoms = symptoms # List of required symptoms
-        self.solution = solution
-        self.category = category
-        self.priority = priority
-        self.confidence = confidence
-        self.create_date = datetime.now().isoformat()
-    
-    def to_dict(self) -> Dict[str, Any]:
-        return {
-            'rule_id': self.rule_id,
-            'title': self.title,
-            'description': self.description,
-            'symptoms': self.symptoms,
-            'solution': self.solution,
-            'category': self.category,
-            'priority': self.priority,
-            'confidence': self.confidence,
-            'create_date': self.create_date
-        }
-    
-    @classmethod
-    def from_dict(cls, data: Dict[str, Any]) -> 'TroubleshootingRule':
-        rule = cls(
-            data['rule_id'], data['title'], data['description'],
-            data['symptoms'], data['solution'], data['category'],
-            data.get('priority', 1), data.get('confidence', 0.8)
-        )
-        rule.create_date = data.get('create_date', datetime.now().isoformat())
-        return rule
-    
-    
-class TroubleshootingCase:
-    """Represents a troubleshooting case/section"""
-    def __init__(self, case_id: str, symptoms: List[str],
-                 diagnosis: str = "", solutions: List[str] = None):
-        self.case_id = case_id
-        self.symptoms = symptoms
-        self.diagnosis = diagnosis
-        self.solutions = solutions or []
-        self.create_date = datetime.now().isoformat()
-    
-    def to_dict(self) -> Dict[str, Any]:
-        return {
-            'case_id': self.case_id,
-            'symptoms': self.symptoms,
-            'diagnosis': self.diagnosis,
-            'solutions': self.solutions,
-            'create_date': self.create_date
-        }
-    
-    @classmethod
-    def from_dict(cls, data: Dict[str, Any]) -> 'TroubleshootingCase':
-        case = cls(
-            data['case_id'], data['symptoms'], data.get('diagnosis', ''), data.get('solutions', [])
-        )
-        case.create_date = data.get('create_date', datetime.now().isoformat())
-        return case
-    
+from PyQt6.QtCore import Qt, QAbstractTableModel, QAbstractListModel, QModelIndex, pyqtSignal
 
-class DataManager:
-    """Handles all CRUD operations and JSON persistence"""
-    def __init__(self, filename: str = "expert_system_data.json"):
-        self.filename = filename
-        self.rules: Dict[TroubleshootingRule] = {}
-        self.cases: Dict[TroubleshootingCase] = {}
-        self.symptoms_list = set()
-        self.load_data()
-    
-    def load_data(self):
-        """Load dat from JSON file"""
-        if os.path.exists(self.filename):
-            try:
-                with open(self.filename, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    
-                # Load rules
-                for rule_data in data.get('rules', []):
-                    rule = TroubleshootingRule.from_dict(rule_data)
-                    self.rules[rule.rule_id] = rule
-                    self.symptoms_list.update(rule.symptoms)
-
-                # Load cases
-                for case_data in data.get('cases', []):
-                    case = TroubleshootingCase.from_dict(case_data)
-                    self.cases[case.case_id] = case
-            except Exception as e:
-                print(f"Error Loading data: {e}")
-                self.create_sample_data()
+# Storage, matching and inference need no Qt, so they live where headless code can import them
+from expert_system_core import (
+    TroubleshootingRule, TroubleshootingCase, SymptomMatcher, NaiveBayesModel,
+    DataManager, InferenceEngine, batch_main
+)
+
+
+class RecordTableModel(QAbstractTableModel):
+    """Rows of rules or cases read from a DataManager dict, updated one row at a time"""
+    def __init__(self, headers: List[str], columns: List, parent=None):
+        super().__init__(parent)
+        self.headers = headers
+        self.columns = columns  # one callable per column: record -> display text
+        self.records: Dict[str, Any] = {}
+        self.ids: List[str] = []
+        self.rows: Dict[str, int] = {}
+
+    def rowCount(self, parent=QModelIndex()):
+        return len(self.ids)
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(self.headers)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        return self.columns[index.column()](self.records[self.ids[index.row()]])
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.headers[section]
+        return None
+
+    def set_records(self, records: Dict[str, Any]):
+        self.beginResetModel()
+        self.records = records
+        self.ids = list(records)
+        self.rows = {record_id: row for row, record_id in enumerate(self.ids)}
+        self.endResetModel()
+
+    def record_id(self, row: int) -> Optional[str]:
+        return self.ids[row] if 0 <= row < len(self.ids) else None
+
+    def record_changed(self, record_id: str):
+        """Insert a new record as the last row, or refresh the row of an existing one"""
+        row = self.rows.get(record_id)
+        if row is None:
+            row = len(self.ids)
+            self.beginInsertRows(QModelIndex(), row, row)
+            self.ids.append(record_id)
+            self.rows[record_id] = row
+            self.endInsertRows()
         else:
-            self.create_sample_data()
-    
-    def save_data(self):
-        """Save data to JSON file"""
-        data = {
-            'rules': [rule.to_dict() for rule in self.rules.values()],
-            'cases': [case.to_dict() for case in self.cases.values()],
-            'symptoms': list(self.symptoms_list)
-        }
-        try:
-            with open(self.filename, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            print(f"Error saving data{e}")
-    
-    def create_sample_data(self):
-        """Create sample troubleshooting rules and data"""
-        sample_rules = [
-            TroubleshootingRule(
-                "RULE001", "Computer Won't Start",
-                "Computer doesn't power on at all",
-                ["No power light", "No fan noise", "Screen blank"],
-                "1. Check power cable connection\n2. Verify power outlet works\n3. Check power supply switch\n4. Test with different power cable",
-                "Hardware", 1, 0.9
-            ),
-            TroubleshootingRule(
-                "RULE002", "Blue screen of death",
-                "Computer crashes woth blue screen error",
-                ["Blue screen", "Automatic restart", "error code"],
-                "1. Note error code\n2. Check recent software/hardware changes\n3. Run memory diagnostic\n4. Update drivers\n5. Check for overheating",
-                "Software", 2, 0.85
-            ),
-            TroubleshootingRule(
-                "RULE003", "Slow Performance",
-                "Computer runs very slowly ",
-                ["Slow boot time", "Programs lag", "High CPU usage"],
-                "1. Run Antivirus scan\n2. Check startuo programs\n3. Clean temperary files\n4. Add more RAM if needed\n5. Defragment haed drive",
-                "Performance", 1, 0.8
-            ),
-            TroubleshootingRule(
-                "RULE004", "Internet Connection issues",
-                "Cannot connect to internet",
-                ["No Internet access", "Connection timeout", "DNS errors"],
-                "1. Check cable connections\n2. Restart router/modern\n3. Run network troubleshooter\n4. Update network drivers\n5. Restart network settings",
-                "Network", 1, 0.85
-            ),
-            TroubleshootingRule(
-                "RULE005", "Overheating issues",
-                "Computer gets too hot and shuts down",
-                ["Computer hot to touch", "Automatic shutdown", "Fan noise loud"],
-                "1. Clean dust from vents and fans\n2. Check therminal paste\n3. Ensure proper ventilation\n4. Check fan functionality\n5. Reduce CPU load",
-                "Hardware", 2, 0.9
-            )
-        ]
-        
-        for rule in sample_rules:
-            self.rules[rule.rule_id] = rule
-            self.symptoms_list.update(rule.symptoms)
+            self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.headers) - 1))
 
-        self.save_data()
-    
-    # CRUD Operations for rules
-    def create_rule(self, rule: TroubleshootingRule) -> bool:
-        if rule.rule_id not in self.rules:
-            self.rules[rule.rule_id] = rule
-            self.symptoms_list.update(rule.symptoms)
-            self.save_data()
-            return True
-        return False
-    
-    def read_rule(self, rule_id: str) -> Optional[TroubleshootingRule]:
-        return self.rules.get(rule_id)
-    
-    def read_all_rules(self) -> List[TroubleshootingRule]:
-        return list(self.rules.values())
-    
-    def update_rule(self, rule: TroubleshootingRule) -> bool:
-        if rule.rule_id in self.rules:
-            old_symptoms = self.rules[rule.rule_id].symptoms
-            self.rules[rule.rule_id] = rule
-            # Update symptoms
-            for symptom in old_symptoms:
-                if not any(symptom in r.symptoms for r in self.rules.values() if r.rule_id != rule.rule_id):
-                    self.symptoms_list.discard(symptom)
-            self.symptoms_list.update(rule.symptoms)
-            self.save_data()
-            return True
-        return False
-    
-    def delete_rule(self, rule_id: str) -> bool:
-        if rule_id in self.rules:
-            old_symptoms = self.rules[rule_id].symptoms
-            del self.rules[rule_id]
-            # Clean up symptoms that are no longer used
-            for symptom in old_symptoms:
-                if not any(symptom in rule.symptoms for rule in self.rules.values()):
-                    self.symptoms_list.discard(symptom)
-                self.save_data()
-                return True
+    def record_removed(self, record_id: str):
+        row = self.rows.pop(record_id, None)
+        if row is None:
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self.ids[row]
+        for shifted in range(row, len(self.ids)):
+            self.rows[self.ids[shifted]] = shifted
+        self.endRemoveRows()
+
+
+class SymptomListModel(QAbstractListModel):
+    """Checkable, filterable symptom list; checked state lives in a set, not in widgets
+
+    Filtering goes through a SymptomMatcher over the symptoms (usually the
+    rule index's own); symptoms it does not know yet are checked directly.
+    """
+    symptom_toggled = pyqtSignal(str, bool)
+    RESET_THRESHOLD = 64  # larger changes (e.g. the first load) reset the view instead
+
+    def __init__(self, matcher: Optional[SymptomMatcher] = None, parent=None):
+        super().__init__(parent)
+        self.matcher = matcher
+        self.symptoms: List[str] = []  # sorted
+        self.by_lower: Dict[str, List[str]] = {}  # matcher key -> spellings in the list
+        self.extra: Set[str] = set()  # symptoms the matcher does not know
+        self.visible: List[str] = []
+        self.checked: Set[str] = set()
+        self.filter_text = ""
+
+    def rowCount(self, parent=QModelIndex()):
+        return len(self.visible)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        symptom = self.visible[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return symptom
+        if role == Qt.ItemDataRole.CheckStateRole:
+            return Qt.CheckState.Checked if symptom in self.checked else Qt.CheckState.Unchecked
+        return None
+
+    def flags(self, index):
+        return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable | Qt.ItemFlag.ItemIsUserCheckable
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if not index.isValid() or role != Qt.ItemDataRole.CheckStateRole:
             return False
-    
-    # CRUD Operaions for Cases
-    def create_case(self, case: TroubleshootingCase) -> bool:
-        if case.case_id not in self.cases:
-            self.cases[case.case_id] = case
-            self.save_data()
-            return True
-        return False
-    
-    def read_case(self, case_id: str) -> Optional[TroubleshootingCase]:
-        return self.cases.get(case_id)
+        self.set_checked(self.visible[index.row()], Qt.CheckState(value) == Qt.CheckState.Checked)
+        return True
 
-    def read_all_cases(self) -> List[TroubleshootingCase]:
-        return list(self.cases.values())
-    
-    def update_case(self, case: TroubleshootingCase) -> bool:
-        if case.case_id in self.cases:
-            self.cases[case.case_id] = case
-            self.save_data()
-            return True
-        return False
-    
-    def delete_case(self, case_id: str) -> bool:
-        if case_id in self.cases:
-            del self.cases[case_id]
-            self.save_data()
-            return True
-        return False
-    
-    def get_all_symptoms(self) -> List[str]:
-        return sorted(list(self.symptoms_list))
+    def set_checked(self, symptom: str, checked: bool):
+        if checked == (symptom in self.checked):
+            return
+        if checked:
+            self.checked.add(symptom)
+        else:
+            self.checked.discard(symptom)
+        row = self.row_of(symptom)
+        if row is not None:
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [Qt.ItemDataRole.CheckStateRole])
+        self.symptom_toggled.emit(symptom, checked)
+
+    def row_of(self, symptom: str) -> Optional[int]:
+        row = bisect.bisect_left(self.visible, symptom)
+        return row if row < len(self.visible) and self.visible[row] == symptom else None
+
+    def selected_symptoms(self) -> List[str]:
+        return sorted(self.checked)
+
+    def set_symptoms(self, symptoms: List[str]):
+        """Replace the symptom list, unchecking symptoms that are gone
+
+        Only the rows that changed are inserted or removed, so scroll position
+        and selection survive rule edits.
+        """
+        wanted = set(symptoms)
+        current = set(self.symptoms)
+        removed = current - wanted
+        added = wanted - current
+        if not removed and not added:
+            return
+        for symptom in [s for s in self.checked if s not in wanted]:
+            self.set_checked(symptom, False)
+        if len(removed) + len(added) > self.RESET_THRESHOLD:
+            self.symptoms = sorted(wanted)
+        else:
+            self.symptoms = [s for s in self.symptoms if s not in removed]
+            for symptom in added:
+                bisect.insort(self.symptoms, symptom)
+        for symptom in removed:
+            spellings = self.by_lower[symptom.lower()]
+            spellings.remove(symptom)
+            if not spellings:
+                del self.by_lower[symptom.lower()]
+        for symptom in added:
+            self.by_lower.setdefault(symptom.lower(), []).append(symptom)
+        known = self.matcher.grams if self.matcher is not None else {}
+        self.extra = {s for s in self.extra | added if s not in removed and s.lower() not in known}
+        self.update_visible()
+
+    def add_symptom(self, symptom: str):
+        if symptom in self.by_lower.get(symptom.lower(), ()):
+            return
+        bisect.insort(self.symptoms, symptom)
+        self.by_lower.setdefault(symptom.lower(), []).append(symptom)
+        self.extra.add(symptom)
+        self.update_visible()
+
+    def set_filter(self, text: str):
+        self.filter_text = text.strip()
+        self.apply_filter()
+
+    def filtered(self) -> List[str]:
+        text = self.filter_text.lower()
+        if not text:
+            return list(self.symptoms)
+        keys = self.matcher.search(text) if self.matcher is not None else set()
+        # The matcher works on lowercased symptoms; map back to their spellings
+        matches = [s for key in keys for s in self.by_lower.get(key, ())]
+        matches += [s for s in self.extra
+                    if (s.lower().startswith(text) if len(text) < 3 else text in s.lower())]
+        return sorted(set(matches))
+
+    def apply_filter(self):
+        self.beginResetModel()
+        self.visible = self.filtered()
+        self.endResetModel()
+
+    def update_visible(self):
+        """Bring the visible rows up to date with row removes and inserts only"""
+        visible = self.filtered()
+        keep, shown = set(visible), set(self.visible)
+        gone = [row for row, symptom in enumerate(self.visible) if symptom not in keep]
+        new = [symptom for symptom in visible if symptom not in shown]
+        if len(gone) + len(new) > self.RESET_THRESHOLD:
+            self.beginResetModel()
+            self.visible = visible
+            self.endResetModel()
+            return
+        # Remove from the bottom up so earlier row numbers stay valid
+        for row in reversed(gone):
+            self.beginRemoveRows(QModelIndex(), row, row)
+            del self.visible[row]
+            self.endRemoveRows()
+        for symptom in new:
+            row = bisect.bisect_left(self.visible, symptom)
+            self.beginInsertRows(QModelIndex(), row, row)
+            self.visible.insert(row, symptom)
+            self.endInsertRows()
+
+
+def create_symptom_picker(model: SymptomListModel, parent_layout: QVBoxLayout) -> tuple:
+    """Add a search box and a virtualized list view over model to parent_layout"""
+    search_edit = QLineEdit()
+    search_edit.setPlaceholderText("Search symptoms...")
+    search_edit.textChanged.connect(model.set_filter)
+    view = QListView()
+    view.setModel(model)
+    view.setUniformItemSizes(True)
+    view.setMaximumHeight(200)
+    parent_layout.addWidget(search_edit)
+    parent_layout.addWidget(view)
+    return search_edit, view
 
 
-class InferenceEngine:
-    """Simple forward-chaining inference engine"""
-    def __init__(self, data_manager: DataManager):
-        self.data_manager = data_manager
-    
-    def diagnose(self, selected_symptoms: List[str]) -> List[tuple]:
-        """Returns kust of (rulem confidence_score) tules"""
-        matches = []
-        rules = self.data_manager.read_all_rules()
-
-        for rule in rules:
-            matched_symptoms = 0
-            for symptom in rule.symptoms:
-                if any(s.lower() in symptom.lower() or symptom.lower() in s.lower() for s in selected_symptoms):
-                    matched_symptoms += 1
-            
-            if matched_symptoms > 0:
-                # Calculate confidence based on symptom match ratio
-                match_ratio = matched_symptoms / len(rule.symptoms)
-                confidence = rule.confidence * match_ratio
-                matches.append((rule, confidence))
-
-        # Sort by confidence and priority
-        matches.sort(key=lambda x: (x[1], x[0].priority), reverse=True)
-        return matches[:5] # Return to[ 5 matches]
-    
-    
 class RuleDialog(QDialog):
     """Dialog for creating/editting rules"""
-    def __init__(self, parent=None, rule: TroubleshootingRule = None, symptoms_list: List[str] = None):
+    def __init__(self, parent=None, rule: TroubleshootingRule = None, symptoms_list: List[str] = None,
+                 matcher: SymptomMatcher = None):
         super().__init__(parent)
         self.rule = rule
         self.symptoms_list = symptoms_list or []
+        self.matcher = matcher
         self.setWindowTitle("Add/Edit Rule")
         self.setModal(True)
         self.resize(500, 600)
@@ -312,7 +280,11 @@ class RuleDialog(QDialog):
         form_layout.addRow("Description:", self.description_edit)
         form_layout.addRow("Category:", self.category_combo)
         form_layout.addRow("Priority:", self.priority_spin)
+        self.conclusions_edit = QLineEdit()
+        self.conclusions_edit.setPlaceholderText("Facts this rule establishes, comma separated")
+
         form_layout.addRow("Confidence:", self.confidence_spin)
+        form_layout.addRow("Concludes:", self.conclusions_edit)
 
         layout.addLayout(form_layout)
         
@@ -330,18 +302,10 @@ class RuleDialog(QDialog):
         add_symptom_layout.addWidget(add_symptom_btn)
         symptoms_layout.addLayout(add_symptom_layout)
 
-        # Symptoms checkboxes
-        self.symptoms_area = QScrollArea()
-        self.symptoms_widget = QWidget()
-        self.symptoms_checkboxes_layout = QVBoxLayout(self.symptoms_widget)
-        self.symptoms_area.setWidget(self.symptoms_widget)
-        self.symptoms_area.setWidgetResizable(True)
-        self.symptoms_area.setMaximumHeight(200)
-
-        self.symptom_checkboxes = {}
-        self.update_symptoms_checkboxes()
-
-        symptoms_layout.addWidget(self.symptoms_area)
+        # Symptoms list
+        self.symptoms_model = SymptomListModel(self.matcher, self)
+        self.symptoms_model.set_symptoms(self.symptoms_list)
+        self.symptom_search_edit, self.symptoms_view = create_symptom_picker(self.symptoms_model, symptoms_layout)
         symptoms_group.setLayout(symptoms_layout)
         layout.addWidget(symptoms_group)
 
@@ -367,21 +331,9 @@ class RuleDialog(QDialog):
         new_symptom = self.new_symptom_edit.text().strip()
         if new_symptom and new_symptom not in self.symptoms_list:
             self.symptoms_list.append(new_symptom)
-            self.update_symptoms_checkboxes()
+            self.symptoms_model.add_symptom(new_symptom)
             self.new_symptom_edit.clear()
     
-    def update_symptoms_checkboxes(self):
-        # Clear existing checkboxes
-        for checkbox in self.symptom_checkboxes.values():
-            checkbox.setParent(None)
-        self.symptom_checkboxes.clear()
-
-        # Create new checkboxes
-        for symptom in sorted(self.symptoms_list):
-            checkbox = QCheckBox(symptom)
-            self.symptom_checkboxes[symptom] = checkbox
-            self.symptoms_checkboxes_layout.addWidget(checkbox)
-    
     def populate_fields(self):
         self.rule_id_edit.setText(self.rule.rule_id)
         self.rule_id_edit.setReadOnly(True)
@@ -391,14 +343,15 @@ class RuleDialog(QDialog):
         self.priority_spin.setValue(self.rule.priority)
         self.confidence_spin.setValue(int(self.rule.confidence * 100))
         self.solution_edit.setPlainText(self.rule.solution)
+        self.conclusions_edit.setText(", ".join(self.rule.conclusions))
 
         # Check relecant symptoms
         for symptom in self.rule.symptoms:
-            if symptom in self.symptom_checkboxes:
-                self.symptom_checkboxes[symptom].setChecked(True)
+            self.symptoms_model.add_symptom(symptom)
+            self.symptoms_model.set_checked(symptom, True)
     
     def get_rule_data(self) -> TroubleshootingRule:
-        selected_symptoms = [symptom for symptom, checkbox in self.symptom_checkboxes.items() if checkbox.isChecked()]
+        selected_symptoms = self.symptoms_model.selected_symptoms()
 
 
         return TroubleshootingRule(
@@ -409,14 +362,15 @@ class RuleDialog(QDialog):
             self.solution_edit.toPlainText(),
             self.category_combo.currentText(),
             self.priority_spin.value(),
-            self.confidence_spin.value() / 100.0
+            self.confidence_spin.value() / 100.0,
+            [fact.strip() for fact in self.conclusions_edit.text().split(",") if fact.strip()]
         )
     
 class ExpertSystemApp(QMainWindow):
     """Main application window"""
-    def __init__(self):
+    def __init__(self, data_file: str = "expert_system_data.db"):
         super().__init__()
-        self.data_manager = DataManager()
+        self.data_manager = DataManager(data_file)
         self.inference_engine = InferenceEngine(self.data_manager)
 
         self.setWindowTitle("Computer Troubleshooting Expert System")
@@ -461,18 +415,25 @@ class ExpertSystemApp(QMainWindow):
         layout.addWidget(instructions)
 
         # Symptoms selection
-        self.symptoms_area = QScrollArea()
-        self.symptoms_widget = QWidget()
-        self.symptoms_layout = QVBoxLayout(self.symptoms_widget)
-        self.symptoms_area.setWidget(self.symptoms_widget)
-        self.symptoms_area.setWidgetResizable(True)
-        self.symptoms_area.setMaximumHeight(200)
-        layout.addWidget(self.symptoms_area)
-
-        # Diagnosis button
+        self.symptoms_model = SymptomListModel(self.data_manager.rule_index.matcher, self)
+        self.symptoms_model.symptom_toggled.connect(self.on_symptom_toggled)
+        self.symptom_search_edit, self.symptoms_view = create_symptom_picker(self.symptoms_model, layout)
+
+        # Diagnosis button and scoring mode
+        diagnose_layout = QHBoxLayout()
         diagnose_btn = QPushButton("Diagnose Problem")
         diagnose_btn.clicked.connect(self.run_diagnosis)
-        layout.addWidget(diagnose_btn)
+        self.scoring_combo = QComboBox()
+        self.scoring_combo.addItems(["Rules", "Naive Bayes (from cases)"])
+        if not NaiveBayesModel.available():
+            self.scoring_combo.model().item(1).setEnabled(False)
+            self.scoring_combo.setItemData(1, "Install NumPy to enable naive Bayes scoring",
+                                           Qt.ItemDataRole.ToolTipRole)
+        self.scoring_combo.currentIndexChanged.connect(self.refresh_diagnosis)
+        diagnose_layout.addWidget(diagnose_btn, 1)
+        diagnose_layout.addWidget(QLabel("Scoring:"))
+        diagnose_layout.addWidget(self.scoring_combo)
+        layout.addLayout(diagnose_layout)
         
         # Results area
         layout.addWidget(QLabel("Diagnosis Results:"))
@@ -508,11 +469,16 @@ class ExpertSystemApp(QMainWindow):
         layout.addLayout(controls_layout)
 
         # Rules table
-        self.rules_table = QTableWidget()
-        self.rules_table.setColumnCount(6)
-        self.rules_table.setHorizontalHeaderLabels([
-            "Rule ID", "Tilte", "Category", "Priority", "Confidence", "Symptoms Count"
-        ])
+        self.rules_model = RecordTableModel(
+            ["Rule ID", "Tilte", "Category", "Priority", "Confidence", "Symptoms Count"],
+            [lambda rule: rule.rule_id, lambda rule: rule.title, lambda rule: rule.category,
+             lambda rule: str(rule.priority), lambda rule: f"{rule.confidence:.0%}",
+             lambda rule: str(len(rule.symptoms))],
+            self
+        )
+        self.rules_table = QTableView()
+        self.rules_table.setModel(self.rules_model)
+        self.rules_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
         header = self.rules_table.horizontalHeader()
         header.setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
         layout.addWidget(self.rules_table)
@@ -542,11 +508,16 @@ class ExpertSystemApp(QMainWindow):
         layout.addLayout(controls_layout)
 
         # Case table
-        self.cases_table = QTableWidget()
-        self.cases_table.setColumnCount(4)
-        self.cases_table.setHorizontalHeaderLabels([
-            "Case ID", "Symptoms Count", "Diagnosis", "Date"
-        ])
+        self.cases_model = RecordTableModel(
+            ["Case ID", "Symptoms Count", "Diagnosis", "Date"],
+            [lambda case: case.case_id, lambda case: str(len(case.symptoms)),
+             lambda case: case.diagnosis[:50] + "..." if len(case.diagnosis) > 50 else case.diagnosis,
+             lambda case: case.create_date[:10]],
+            self
+        )
+        self.cases_table = QTableView()
+        self.cases_table.setModel(self.cases_model)
+        self.cases_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
         header = self.cases_table.horizontalHeader()
         header.setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
         layout.addWidget(self.cases_table)
@@ -556,137 +527,169 @@ class ExpertSystemApp(QMainWindow):
     
     def load_data(self):
         """Load all data into interfance"""
-        self.load_symptoms_checkboxes()
+        self.load_symptoms()
         self.load_rules_table()
         self.load_cases_table()
     
-    def load_symptoms_checkboxes(self):
-        """Load symptoms as checkboxes"""
-        # Clear existing
-        for i in reversed(range(self.symptoms_layout.count())):
-            self.symptoms_layout.itemAt(i).widget().setParent(None)
-
-        # Add checkboxes for each symptom
-        symptoms = self.data_manager.get_all_symptoms()
-        self.symptom_checkboxes = {}
-
-        for symptom in symptoms:
-            checkbox = QCheckBox(symptom)
-            self.symptom_checkboxes[symptom] = checkbox
-            self.symptoms_layout.addWidget(checkbox)
+    def load_symptoms(self):
+        """Load symptoms into the picker with nothing checked"""
+        self.symptoms_model.checked.clear()
+        self.inference_engine.reset_session()
+        self.symptoms_model.set_symptoms(self.data_manager.get_all_symptoms())
+
+    def sync_symptoms(self):
+        """Match the picker to the rule base, keeping what is checked"""
+        self.symptoms_model.set_symptoms(self.data_manager.get_all_symptoms())
+
+    def use_bayes(self) -> bool:
+        return self.scoring_combo.currentIndex() == 1
+
+    def on_symptom_toggled(self, symptom: str, checked: bool):
+        """Re-rank the results as each symptom is checked or unchecked"""
+        matches, derived = self.inference_engine.toggle_symptom(symptom, checked)
+        selected_symptoms = list(self.inference_engine.session.selected)
+        if not selected_symptoms:
+            self.results_text.clear()
+        elif self.use_bayes():
+            self.show_matches(self.inference_engine.diagnose_bayes(selected_symptoms), selected_symptoms)
+        else:
+            self.show_matches(matches, selected_symptoms, derived)
+
+    def refresh_diagnosis(self):
+        """Re-score the current selection, e.g. after switching scoring mode"""
+        selected_symptoms = self.symptoms_model.selected_symptoms()
+        if selected_symptoms:
+            self.run_diagnosis()
         
     def load_rules_table(self):
         """Load rules into the table"""
-        rules = self.data_manager.read_all_rules()
-        self.rules_table.setRowCount(len(rules))
-
-        for row, rule in enumerate(rules):
-            self.rules_table.setItem(row, 0, QTableWidgetItem(rule.rule_id))
-            self.rules_table.setItem(row, 1, QTableWidgetItem(rule.title))
-            self.rules_table.setItem(row, 2, QTableWidgetItem(rule.category))
-            self.rules_table.setItem(row, 3, QTableWidgetItem(str(rule.priority)))
-            self.rules_table.setItem(row, 4, QTableWidgetItem(f"{rule.confidence:.0%}"))
-            self.rules_table.setItem(row, 5, QTableWidgetItem(str(len(rule.symptoms))))
+        self.rules_model.set_records(self.data_manager.rules)
         
     def load_cases_table(self):
         """Load cases into the table"""
-        cases = self.data_manager.read_all_cases()
-        self.cases_table.setRowCount(len(cases))
-
-        for row, case in enumerate(cases):
-            self.cases_table.setItem(row, 0, QTableWidgetItem(case.case_id))
-            self.cases_table.setItem(row, 1, QTableWidgetItem(str(len(case.symptoms))))
-            self.cases_table.setItem(row, 2, QTableWidgetItem(case.diagnosis[:50] + "..." if len(case.diagnosis) > 50 else case.diagnosis))
-            self.cases_table.setItem(row, 3, QTableWidgetItem(case.create_date[:10]))
+        self.cases_model.set_records(self.data_manager.cases)
 
     def run_diagnosis(self):
         """Run the expert system diagnosis"""
-        selected_symptoms = [symptom for symptom, checkbox in self.symptom_checkboxes.items() if checkbox.isChecked()]
+        selected_symptoms = self.symptoms_model.selected_symptoms()
 
 
         if not selected_symptoms:
             QMessageBox.warning(self, "Warning", "Please select at least one symptom.")
             return
 
-        matches = self.inference_engine.diagnose(selected_symptoms)
+        if self.use_bayes():
+            self.show_matches(self.inference_engine.diagnose_bayes(selected_symptoms), selected_symptoms)
+        else:
+            matches, derived = self.inference_engine.infer(selected_symptoms)
+            self.show_matches(matches, selected_symptoms, derived)
 
+    def show_matches(self, matches: List[tuple], selected_symptoms: List[str], derived: Dict[str, float] = None):
+        """Display ranked rule matches for the selected symptoms"""
         if matches:
             result_text = "Based on the symptoms, here are the most likely problem\n\n"
+            if derived:
+                facts = ", ".join(f"{fact} ({weight:.0%})" for fact, weight in derived.items())
+                result_text += f"Derived facts: {facts}\n\n"
+            score_name = "Probability" if self.use_bayes() else "Confidence"
             for i, (rule, confidence) in enumerate(matches, 1):
-                result_text += f"{i}. {rule.title} (Confidence: {confidence:.0%})\n"
+                result_text += f"{i}. {rule.title} ({score_name}: {confidence:.0%})\n"
                 result_text += f"   Category: {rule.category}\n"
                 result_text += f"   Solution:\n{rule.solution}\n\n"
         else:
             result_text = "No matching problems found. Please check if you've selected the correct symptoms or contact technical support."
 
-        self.results_text.setPlainText(result_text)
+        display_text = result_text
+        similar = self.inference_engine.similar_cases(selected_symptoms)
+        if similar:
+            display_text += "\n\nSimilar past cases:\n"
+            for case, similarity in similar:
+                display_text += f"- {case.case_id} ({similarity:.0%} similar, {case.create_date[:10]}): {', '.join(case.symptoms)}\n"
+
+        self.results_text.setPlainText(display_text)
         self.current_diagnosis = result_text
+        self.current_rule_id = matches[0][0].rule_id if matches else ""
         self.current_symptoms = selected_symptoms
 
     def add_rule(self):
         """Add a new rule"""
-        dialog = RuleDialog(self, symptoms_list=self.data_manager.get_all_symptoms())
+        dialog = RuleDialog(self, symptoms_list=self.data_manager.get_all_symptoms(),
+                            matcher=self.data_manager.rule_index.matcher)
         if dialog.exec() == QDialog.DialogCode.Accepted:
             rule = dialog.get_rule_data()
             if self.data_manager.create_rule(rule):
-                self.load_data()
+                self.rules_model.record_changed(rule.rule_id)
+                self.sync_symptoms()
                 QMessageBox.information(self, "Success", "Rule added successfully!")
             else:
                 QMessageBox.warning(self, "Error", "Rule ID already exist exist!")
 
     def edit_rule(self):
         """Edit selected rule"""
-        current_row = self.rules_table.currentRow()
-        if current_row >= 0:
-            rule_id = self.rules_table.item(current_row, 0).text()
+        rule_id = self.rules_model.record_id(self.rules_table.currentIndex().row())
+        if rule_id is not None:
             rule = self.data_manager.read_rule(rule_id)
             if rule:
-                dialog = RuleDialog(self, rule, self.data_manager.get_all_symptoms())
+                dialog = RuleDialog(self, rule, self.data_manager.get_all_symptoms(),
+                                    self.data_manager.rule_index.matcher)
                 if dialog.exec() == QDialog.DialogCode.Accepted:
                     update_rule = dialog.get_rule_data()
                     self.data_manager.update_rule(update_rule)
-                    self.load_data()
+                    self.rules_model.record_changed(update_rule.rule_id)
+                    self.sync_symptoms()
                     QMessageBox.information(self, "Success", "Rule updated successfully!")
 
     def delete_rule(self):
         """Delete selected rule"""
-        current_row = self.rules_table.currentRow()
-        if current_row >= 0:
-            rule_id = self.rules_table.item(current_row, 0).text()
+        rule_id = self.rules_model.record_id(self.rules_table.currentIndex().row())
+        if rule_id is not None:
             reply = QMessageBox.question(self, "Confirm", f"Delete rule {rule_id}?")
             if reply == QMessageBox.StandardButton.Yes:
                 self.data_manager.delete_rule(rule_id)
-                self.load_data()
+                self.rules_model.record_removed(rule_id)
+                self.sync_symptoms()
                 QMessageBox.information(self, "Success", "Rule deleted successfully!")
         
     def save_current_case(self):
         """Save current diagnosis as a case"""
         if hasattr(self, 'current_symptoms') and hasattr(self, 'current_diagnosis'):
             case_id = f"CASE_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-            case = TroubleshootingCase(case_id, self.current_symptoms, self.current_diagnosis)
-            self.data_manager.create_case(case)
-            self.load_cases_table()
+            case = TroubleshootingCase(case_id, self.current_symptoms, self.current_diagnosis,
+                                       rule_id=self.current_rule_id)
+            if self.data_manager.create_case(case):
+                self.cases_model.record_changed(case_id)
             QMessageBox.information(self, "Success", f"Case saved as {case_id}?")
         else:
             QMessageBox.warning(self, "Warning", "No diagnosis to save. Please run a diagnosis first.")
 
     def delete_case(self):
         """Delete selected case"""
-        current_row = self.cases_table.currentRow()
-        if current_row >= 0:
-            case_id = self.cases_table.item(current_row, 0).text()
+        case_id = self.cases_model.record_id(self.cases_table.currentIndex().row())
+        if case_id is not None:
             reply = QMessageBox.question(self, "Confirm", f"Delete case {case_id}?")
             if reply == QMessageBox.StandardButton.Yes:
                 self.data_manager.delete_case(case_id)
-                self.load_cases_table()
+                self.cases_model.record_removed(case_id)
                 QMessageBox.information(self, "Success", "Case deleted successfully!")
 
         
 def main():
-    app = QApplication(sys.argv)
+    parser = argparse.ArgumentParser(description="Computer troubleshooting expert system")
+    parser.add_argument("--data", default="expert_system_data.db",
+                        help="knowledge base file (.db/.sqlite for SQLite, otherwise JSON)")
+    parser.add_argument("--batch", metavar="INPUT",
+                        help="diagnose a JSONL file of symptom lists without opening the GUI")
+    parser.add_argument("--out", help="JSONL file for batch results (default: stdout)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="worker processes for batch diagnosis")
+    args, qt_args = parser.parse_known_args()
+    if args.batch:
+        sys.exit(batch_main(args))
+
+    app = QApplication(sys.argv[:1] + qt_args)
     app.setApplicationName("Computer troubleshooting Expert System")
 
-    window = ExpertSystemApp()
+    window = ExpertSystemApp(args.data)
     window.show()
     
     sys.exit(app.exec())
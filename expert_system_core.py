@@ -0,0 +1,1291 @@
+import sys
+import json
+import os
+import time
+import math
+import heapq
+import random
+import zlib
+import sqlite3
+import argparse
+import threading
+import multiprocessing
+import importlib.util
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional, Any, Set, Iterable, Iterator, Callable
+
+
+class TroubleshootingRule:
+    """Represents a troubleshooting rule with symptoms and solutions
+
+    Identifiers and symptoms are interned, since the same strings repeat
+    across many rules. description and solution may be left as None with a
+    text_loader, in which case they are read from storage on first access.
+    """
+    __slots__ = ('rule_id', 'title', '_description', 'symptoms', '_solution', 'category',
+                 'priority', 'confidence', 'conclusions', 'create_date', 'text_loader')
+
+    def __init__(self, rule_id: str, title: str, description: Optional[str], 
+                 symptoms: List[str], solution: Optional[str], category: str, 
+                 priority: int = 1, confidence: float = 0.8,
+                 conclusions: List[str] = None,
+                 text_loader: Callable[[str], tuple] = None):
+        self.rule_id = sys.intern(rule_id)
+        self.title = title
+        self._description = description
+        self.symptoms = [sys.intern(s) for s in symptoms] # List of required symptoms
+        self._solution = solution
+        self.category = sys.intern(category)
+        self.priority = priority
+        self.confidence = confidence
+        self.conclusions = [sys.intern(c) for c in conclusions or []] # Facts asserted when the rule fires
+        self.create_date = datetime.now().isoformat()
+        self.text_loader = text_loader
+
+    def load_text(self):
+        description, solution = self.text_loader(self.rule_id)
+        if self._description is None:
+            self._description = description or ""
+        if self._solution is None:
+            self._solution = solution or ""
+
+    @property
+    def description(self) -> str:
+        if self._description is None:
+            self.load_text()
+        return self._description
+
+    @description.setter
+    def description(self, value: str):
+        self._description = value
+
+    @property
+    def solution(self) -> str:
+        if self._solution is None:
+            self.load_text()
+        return self._solution
+
+    @solution.setter
+    def solution(self, value: str):
+        self._solution = value
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'rule_id': self.rule_id,
+            'title': self.title,
+            'description': self.description,
+            'symptoms': self.symptoms,
+            'solution': self.solution,
+            'category': self.category,
+            'priority': self.priority,
+            'confidence': self.confidence,
+            'conclusions': self.conclusions,
+            'create_date': self.create_date
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], text_loader: Callable[[str], tuple] = None) -> 'TroubleshootingRule':
+        # Without a loader, missing text fields are simply empty
+        missing = None if text_loader else ""
+        rule = cls(
+            data['rule_id'], data['title'], data.get('description', missing),
+            data['symptoms'], data.get('solution', missing), data['category'],
+            data.get('priority', 1), data.get('confidence', 0.8),
+            data.get('conclusions', []), text_loader
+        )
+        rule.create_date = data.get('create_date', datetime.now().isoformat())
+        return rule
+    
+    
+class TroubleshootingCase:
+    """Represents a troubleshooting case/section
+
+    As with rules, a diagnosis left as None is read through text_loader on first access.
+    rule_id names the rule the case was diagnosed as, if any.
+    """
+    __slots__ = ('case_id', 'symptoms', '_diagnosis', 'solutions', 'create_date', 'rule_id', 'text_loader')
+
+    def __init__(self, case_id: str, symptoms: List[str],
+                 diagnosis: Optional[str] = "", solutions: List[str] = None,
+                 text_loader: Callable[[str], str] = None, rule_id: str = ""):
+        self.case_id = sys.intern(case_id)
+        self.symptoms = [sys.intern(s) for s in symptoms]
+        self._diagnosis = diagnosis
+        self.solutions = solutions or []
+        self.create_date = datetime.now().isoformat()
+        self.rule_id = sys.intern(rule_id)
+        self.text_loader = text_loader
+
+    @property
+    def diagnosis(self) -> str:
+        if self._diagnosis is None:
+            self._diagnosis = self.text_loader(self.case_id) or ""
+        return self._diagnosis
+
+    @diagnosis.setter
+    def diagnosis(self, value: str):
+        self._diagnosis = value
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'case_id': self.case_id,
+            'symptoms': self.symptoms,
+            'diagnosis': self.diagnosis,
+            'solutions': self.solutions,
+            'create_date': self.create_date,
+            'rule_id': self.rule_id
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], text_loader: Callable[[str], str] = None) -> 'TroubleshootingCase':
+        case = cls(
+            data['case_id'], data['symptoms'], data.get('diagnosis', None if text_loader else ''),
+            data.get('solutions', []), text_loader, data.get('rule_id', '')
+        )
+        case.create_date = data.get('create_date', datetime.now().isoformat())
+        return case
+    
+
+class SymptomMatcher:
+    """Trigram index resolving free-text symptoms to known ones with a match weight"""
+    THRESHOLD = 0.5  # minimum trigram similarity for a fuzzy match
+    MAX_EDIT_RATIO = 0.2  # and at most this many edits per character, so only typos match
+    CONTAINMENT_WEIGHT = 0.8  # weight when one symptom contains the other
+
+    def __init__(self):
+        self.postings: Dict[str, Set[str]] = {}  # trigram -> symptoms
+        self.grams: Dict[str, Set[str]] = {}  # symptom -> trigrams
+        self._cache: Dict[str, Dict[str, float]] = {}
+
+    @staticmethod
+    def trigrams(text: str) -> Set[str]:
+        padded = f"  {text} "
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+    @staticmethod
+    def edit_distance(a: str, b: str, limit: int) -> int:
+        """Levenshtein distance, or limit + 1 as soon as it is known to exceed limit"""
+        if abs(len(a) - len(b)) > limit:
+            return limit + 1
+        previous = list(range(len(b) + 1))
+        for i, ca in enumerate(a, 1):
+            current = [i]
+            for j, cb in enumerate(b, 1):
+                current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+            if min(current) > limit:
+                return limit + 1
+            previous = current
+        return previous[-1]
+
+    def add(self, symptom: str):
+        if symptom in self.grams:
+            return
+        grams = self.trigrams(symptom)
+        self.grams[symptom] = grams
+        for gram in grams:
+            self.postings.setdefault(gram, set()).add(symptom)
+        self._cache.clear()
+
+    def remove(self, symptom: str):
+        for gram in self.grams.pop(symptom, ()):
+            symptoms = self.postings[gram]
+            symptoms.discard(symptom)
+            if not symptoms:
+                del self.postings[gram]
+        self._cache.clear()
+
+    def search(self, text: str) -> Set[str]:
+        """Known symptoms containing the text, or starting with it when it is shorter than a trigram"""
+        text = text.lower()
+        if len(text) < 3:
+            if not text:
+                return set()
+            # The padded leading trigrams double as a one- or two-letter prefix index;
+            # " ab" alone would also match words inside a symptom, hence the filter
+            padded = "  " + text
+            postings = [self.postings.get(padded[i:i + 3], set()) for i in range(len(text))]
+            candidates = set(postings[0]).intersection(*postings[1:])
+            return {s for s in candidates if s.startswith(text)}
+        postings = sorted((self.postings.get(text[i:i + 3], set()) for i in range(len(text) - 2)), key=len)
+        candidates = set(postings[0]).intersection(*postings[1:])
+        return {s for s in candidates if text in s}
+
+    def resolve(self, query: str) -> Dict[str, float]:
+        """Known symptoms matching the query, mapped to a weight in (0, 1]"""
+        query = query.lower().strip()
+        resolved = self._cache.get(query)
+        if resolved is not None:
+            return resolved
+
+        resolved = {}
+        if query in self.grams:
+            resolved[query] = 1.0
+        query_grams = self.trigrams(query)
+        shared: Counter = Counter()
+        for gram in query_grams:
+            shared.update(self.postings.get(gram, ()))
+        if len(query) < 3:
+            # Too short to share a trigram with the symptoms containing it
+            shared.update({s: 0 for s in self.grams if query in s})
+
+        for symptom, common in shared.items():
+            if symptom == query:
+                continue
+            weight = 2 * common / (len(query_grams) + len(self.grams[symptom]))
+            if query in symptom or symptom in query:
+                resolved[symptom] = max(weight, self.CONTAINMENT_WEIGHT)
+                continue
+            if weight < self.THRESHOLD:
+                continue
+            # Shared trigrams alone pair up different symptoms ("automatic restart" and
+            # "automatic shutdown"), so also require the spellings to be a few edits apart
+            limit = int(self.MAX_EDIT_RATIO * max(len(query), len(symptom)))
+            if self.edit_distance(query, symptom, limit) <= limit:
+                resolved[symptom] = weight
+        self._cache[query] = resolved
+        return resolved
+
+
+class RuleIndex:
+    """Inverted index from lowercased symptom to the rules that require it"""
+    def __init__(self):
+        self.symptom_rules: Dict[str, Counter] = {}  # symptom -> {rule_id: occurrences}
+        self.rule_symptoms: Dict[str, List[str]] = {}  # rule_id -> lowercased symptoms
+        self.symptom_counts: Counter = Counter()  # original spelling -> rules using it
+        self.matcher = SymptomMatcher()
+
+    def add_rule(self, rule: TroubleshootingRule):
+        lowered = [s.lower() for s in rule.symptoms]
+        self.rule_symptoms[rule.rule_id] = lowered
+        for symptom in lowered:
+            if symptom not in self.symptom_rules:
+                self.symptom_rules[symptom] = Counter()
+                self.matcher.add(symptom)
+            self.symptom_rules[symptom][rule.rule_id] += 1
+        self.symptom_counts.update(set(rule.symptoms))
+
+    def remove_rule(self, rule: TroubleshootingRule):
+        for symptom in self.rule_symptoms.pop(rule.rule_id, []):
+            rules = self.symptom_rules.get(symptom)
+            if rules is None:
+                continue
+            rules.pop(rule.rule_id, None)
+            if not rules:
+                del self.symptom_rules[symptom]
+                self.matcher.remove(symptom)
+        self.symptom_counts.subtract(set(rule.symptoms))
+        for symptom in set(rule.symptoms):
+            if self.symptom_counts[symptom] <= 0:
+                del self.symptom_counts[symptom]
+
+    def resolve_symptoms(self, selected_symptoms: List[str]) -> Dict[str, float]:
+        """Best match weight for every known symptom matched by the selection"""
+        weights: Dict[str, float] = {}
+        for selected in selected_symptoms:
+            for symptom, weight in self.matcher.resolve(selected).items():
+                if weight > weights.get(symptom, 0.0):
+                    weights[symptom] = weight
+        return weights
+
+    def candidate_rules(self, selected_symptoms: List[str]) -> Dict[str, float]:
+        """Weighted number of matched symptoms for every rule that matches at least one"""
+        scores: Dict[str, float] = {}
+        for symptom, weight in self.resolve_symptoms(selected_symptoms).items():
+            for rule_id, occurrences in self.symptom_rules[symptom].items():
+                scores[rule_id] = scores.get(rule_id, 0.0) + weight * occurrences
+        return scores
+
+
+class CaseIndex:
+    """MinHash LSH index over the symptom sets of saved cases
+
+    Cases with the same symptom set share one entry, known by an integer id.
+    Each set gets a MinHash signature of NUM_PERM values split into BANDS
+    bands, and sets landing in the same bucket for any band become candidates.
+    With 12 bands of 4 rows that happens mostly above a Jaccard similarity of
+    about 0.5. Only the candidates are compared exactly.
+    """
+    NUM_PERM = 48
+    BANDS = 12
+    PRIME = (1 << 61) - 1
+
+    def __init__(self):
+        rng = random.Random(0)
+        self.perms = [(rng.randrange(1, self.PRIME), rng.randrange(self.PRIME)) for _ in range(self.NUM_PERM)]
+        self.rows = self.NUM_PERM // self.BANDS
+        self.buckets: List[Dict[int, Set[int]]] = [{} for _ in range(self.BANDS)]  # band hash -> set ids
+        self.set_ids: Dict[frozenset, int] = {}
+        self.sets: Dict[int, frozenset] = {}
+        self.groups: Dict[int, List[str]] = {}  # set id -> case ids, oldest first
+        self.case_sets: Dict[str, int] = {}
+        self.next_id = 0
+        self._hash_cache: Dict[str, List[int]] = {}
+
+    @staticmethod
+    def symptom_set(symptoms: List[str]) -> frozenset:
+        return frozenset(s.lower() for s in symptoms)
+
+    def symptom_hashes(self, symptom: str) -> List[int]:
+        hashes = self._hash_cache.get(symptom)
+        if hashes is None:
+            h = zlib.crc32(symptom.encode('utf-8'))
+            hashes = [(a * h + b) % self.PRIME for a, b in self.perms]
+            self._hash_cache[symptom] = hashes
+        return hashes
+
+    def band_keys(self, symptoms: frozenset) -> List[int]:
+        signature = list(map(min, *(self.symptom_hashes(s) for s in symptoms))) if len(symptoms) > 1 \
+            else self.symptom_hashes(next(iter(symptoms)))
+        # Hashing each band to one int keeps bucket keys small; a rare clash only adds a candidate
+        return [hash(tuple(signature[band * self.rows:(band + 1) * self.rows])) for band in range(self.BANDS)]
+
+    def add_case(self, case: TroubleshootingCase):
+        symptoms = self.symptom_set(case.symptoms)
+        if not symptoms:
+            return
+        set_id = self.set_ids.get(symptoms)
+        if set_id is not None:
+            self.case_sets[case.case_id] = set_id
+            self.groups[set_id].append(case.case_id)
+            return
+        set_id = self.next_id
+        self.next_id += 1
+        self.set_ids[symptoms] = set_id
+        self.sets[set_id] = symptoms
+        self.case_sets[case.case_id] = set_id
+        self.groups[set_id] = [case.case_id]
+        for bucket, key in zip(self.buckets, self.band_keys(symptoms)):
+            bucket.setdefault(key, set()).add(set_id)
+
+    def remove_case(self, case_id: str):
+        set_id = self.case_sets.pop(case_id, None)
+        if set_id is None:
+            return
+        group = self.groups[set_id]
+        group.remove(case_id)
+        if group:
+            return
+        del self.groups[set_id]
+        symptoms = self.sets.pop(set_id)
+        del self.set_ids[symptoms]
+        for bucket, key in zip(self.buckets, self.band_keys(symptoms)):
+            members = bucket[key]
+            members.discard(set_id)
+            if not members:
+                del bucket[key]
+
+    def query(self, symptoms: List[str], k: int = 3) -> List[tuple]:
+        """Up to k (case_id, similarity) pairs, most similar and then most recent first"""
+        query = self.symptom_set(symptoms)
+        if not query:
+            return []
+        candidates = set()
+        for bucket, key in zip(self.buckets, self.band_keys(query)):
+            candidates.update(bucket.get(key, ()))
+        sets = self.sets
+        scored = [(len(query & sets[c]) / len(query | sets[c]), c) for c in candidates]
+        results = []
+        for similarity, set_id in heapq.nlargest(k, scored, key=lambda x: x[0]):
+            for case_id in reversed(self.groups[set_id]):
+                results.append((case_id, similarity))
+                if len(results) == k:
+                    return results
+        return results
+
+
+class NaiveBayesModel:
+    """Multinomial naive Bayes over symptoms, labelled by rule id
+
+    Trained from cases that record their rule, with every rule also counted
+    once as a pseudo-case so rules without history still have a prior. The
+    symptom-by-rule count matrix is kept sparse, one {label: count} column per
+    symptom, and columns are turned into NumPy arrays when first queried
+    after they change. Counting needs no NumPy, so only scoring depends on it.
+    """
+    ALPHA = 1.0  # Laplace smoothing
+
+    def __init__(self):
+        self.labels: List[str] = []
+        self.label_index: Dict[str, int] = {}
+        self.doc_counts: List[int] = []  # cases (and pseudo-cases) per label
+        self.token_totals: List[int] = []  # symptom occurrences per label
+        self.columns: Dict[str, Dict[int, int]] = {}  # symptom -> {label: count}
+        self._arrays: Dict[str, tuple] = {}
+
+    @staticmethod
+    def available() -> bool:
+        return importlib.util.find_spec("numpy") is not None
+
+    def label(self, rule_id: str) -> int:
+        index = self.label_index.get(rule_id)
+        if index is None:
+            index = len(self.labels)
+            self.labels.append(rule_id)
+            self.label_index[rule_id] = index
+            self.doc_counts.append(0)
+            self.token_totals.append(0)
+        return index
+
+    def update(self, rule_id: str, symptoms: List[str], sign: int):
+        if not rule_id or not symptoms:
+            return
+        index = self.label(rule_id)
+        self.doc_counts[index] += sign
+        self.token_totals[index] += sign * len(symptoms)
+        for symptom in symptoms:
+            key = symptom.lower()
+            column = self.columns.setdefault(key, {})
+            count = column.get(index, 0) + sign
+            if count > 0:
+                column[index] = count
+            else:
+                column.pop(index, None)
+                if not column:
+                    del self.columns[key]
+            self._arrays.pop(key, None)
+
+    def add_rule(self, rule: TroubleshootingRule):
+        self.update(rule.rule_id, rule.symptoms, 1)
+
+    def remove_rule(self, rule: TroubleshootingRule):
+        self.update(rule.rule_id, rule.symptoms, -1)
+
+    def add_case(self, case: TroubleshootingCase):
+        self.update(case.rule_id, case.symptoms, 1)
+
+    def remove_case(self, case: TroubleshootingCase):
+        self.update(case.rule_id, case.symptoms, -1)
+
+    def column_arrays(self, key: str) -> tuple:
+        """Label indices and log((count + alpha) / alpha) for one symptom column"""
+        arrays = self._arrays.get(key)
+        if arrays is None:
+            import numpy as np
+            column = self.columns[key]
+            indices = np.fromiter(column.keys(), dtype=np.intp, count=len(column))
+            counts = np.fromiter(column.values(), dtype=float, count=len(column))
+            arrays = (indices, np.log1p(counts / self.ALPHA))
+            self._arrays[key] = arrays
+        return arrays
+
+    def posteriors(self, weights: Dict[str, float], rule_ids: Optional[Iterable[str]] = None) -> 'numpy.ndarray':
+        """Posterior probability of every label given symptoms weighted by match quality
+
+        With rule_ids given, only those labels compete; cases whose rule was
+        deleted then take no probability away from the rules that remain.
+        """
+        import numpy as np
+        n = len(self.labels)
+        docs = np.array(self.doc_counts, dtype=float)
+        token_totals = np.array(self.token_totals, dtype=float)
+        active = docs > 0
+        if rule_ids is not None:
+            active &= np.fromiter((label in rule_ids for label in self.labels), dtype=bool, count=n)
+        if not active.any():
+            return np.zeros(n)
+        vocabulary = max(len(self.columns), 1)
+        known = {key: weight for key, weight in weights.items() if key in self.columns}
+
+        # log P(label) + sum of weight * log P(symptom | label); every label starts
+        # as if it had never seen the symptoms, and the sparse columns add the rest
+        scores = np.full(n, -np.inf)
+        scores[active] = np.log(docs[active] / docs[active].sum())
+        scores[active] += sum(known.values()) * (math.log(self.ALPHA) -
+                                                 np.log(token_totals[active] + self.ALPHA * vocabulary))
+        for key, weight in known.items():
+            indices, logs = self.column_arrays(key)
+            scores[indices] += weight * logs
+
+        scores -= scores[active].max()
+        probabilities = np.exp(scores)
+        return probabilities / probabilities.sum()
+
+
+class JsonStorage:
+    """Keeps the knowledge base in a JSON snapshot plus an append-only journal
+
+    Every change is appended to the journal as one JSON line. Once the journal
+    grows past journal_limit bytes it is rotated and merged into a fresh
+    snapshot on a background thread; loading replays snapshot and journals.
+    """
+    def __init__(self, filename: str, journal_limit: int = 1024 * 1024):
+        self.filename = filename
+        self.journal_name = filename + ".journal"
+        self.rotated_name = self.journal_name + ".old"
+        self.journal_limit = journal_limit
+        self.data_manager = None
+        self.journal = None
+        self.lock = threading.Lock()
+        self.compactor: Optional[threading.Thread] = None
+
+    def bind(self, data_manager: 'DataManager'):
+        self.data_manager = data_manager
+
+    def load(self) -> Optional[Dict[str, list]]:
+        if not any(os.path.exists(name) for name in (self.filename, self.rotated_name, self.journal_name)):
+            return None
+        if os.path.exists(self.rotated_name):
+            # A compaction was interrupted; finish it before taking new writes
+            self.compact()
+        rules, cases = self.read_snapshot()
+        self.replay(self.journal_name, rules, cases)
+        return {'rules': list(rules.values()), 'cases': list(cases.values())}
+
+    def read_snapshot(self) -> tuple:
+        rules, cases = {}, {}
+        if os.path.exists(self.filename):
+            with open(self.filename, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            rules = {d['rule_id']: d for d in data.get('rules', [])}
+            cases = {d['case_id']: d for d in data.get('cases', [])}
+        return rules, cases
+
+    @staticmethod
+    def replay(journal_name: str, rules: Dict[str, dict], cases: Dict[str, dict]):
+        if not os.path.exists(journal_name):
+            return
+        with open(journal_name, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # torn final line from a crash mid-append
+                op, data = entry['op'], entry['data']
+                if op == 'put_rule':
+                    rules[data['rule_id']] = data
+                elif op == 'delete_rule':
+                    rules.pop(data, None)
+                elif op == 'put_case':
+                    cases[data['case_id']] = data
+                elif op == 'delete_case':
+                    cases.pop(data, None)
+
+    def write_snapshot(self, rules: List[dict], cases: List[dict]):
+        symptoms = set()
+        for rule in rules:
+            symptoms.update(rule['symptoms'])
+        data = {'rules': rules, 'cases': cases, 'symptoms': list(symptoms)}
+        # Write beside the file and swap it in, so a crash never leaves half a file
+        temp_name = self.filename + ".tmp"
+        with open(temp_name, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        os.replace(temp_name, self.filename)
+
+    def compact(self):
+        """Merge the rotated journal into the snapshot"""
+        rules, cases = self.read_snapshot()
+        self.replay(self.rotated_name, rules, cases)
+        self.write_snapshot(list(rules.values()), list(cases.values()))
+        os.remove(self.rotated_name)
+
+    def compact_in_background(self):
+        try:
+            self.compact()
+        except Exception as e:
+            # The rotated journal stays on disk and is merged before the next rotation
+            print(f"Error compacting journal: {e}")
+
+    def wait_for_compaction(self):
+        if self.compactor is not None:
+            self.compactor.join()
+            self.compactor = None
+
+    def save_all(self):
+        self.wait_for_compaction()
+        with self.lock:
+            self.write_snapshot([rule.to_dict() for rule in self.data_manager.rules.values()],
+                                [case.to_dict() for case in self.data_manager.cases.values()])
+            if self.journal is not None:
+                self.journal.close()
+                self.journal = None
+            if os.path.exists(self.journal_name):
+                os.remove(self.journal_name)
+
+    def append(self, op: str, data: Any):
+        with self.lock:
+            if self.journal is None:
+                torn = False
+                if os.path.exists(self.journal_name) and os.path.getsize(self.journal_name) > 0:
+                    with open(self.journal_name, 'rb') as f:
+                        f.seek(-1, os.SEEK_END)
+                        torn = f.read(1) != b"\n"
+                self.journal = open(self.journal_name, 'a', encoding='utf-8')
+                if torn:
+                    self.journal.write("\n")  # start clear of a line cut off by a crash
+            self.journal.write(json.dumps({'op': op, 'data': data}, ensure_ascii=False) + "\n")
+            self.journal.flush()
+            if self.journal.tell() < self.journal_limit or (self.compactor and self.compactor.is_alive()):
+                return
+            if os.path.exists(self.rotated_name):
+                # An earlier compaction failed; merge it now rather than rotate over it
+                self.compact()
+            # Rotate under the lock so writers never wait on the rewrite itself
+            self.journal.close()
+            self.journal = None
+            os.replace(self.journal_name, self.rotated_name)
+        self.compactor = threading.Thread(target=self.compact_in_background, name="journal-compaction")
+        self.compactor.start()
+
+    def put_rule(self, rule: TroubleshootingRule):
+        self.append('put_rule', rule.to_dict())
+
+    def delete_rule(self, rule_id: str):
+        self.append('delete_rule', rule_id)
+
+    def put_case(self, case: TroubleshootingCase):
+        self.append('put_case', case.to_dict())
+
+    def delete_case(self, case_id: str):
+        self.append('delete_case', case_id)
+
+
+class SqliteStorage:
+    """Keeps rules and cases as rows in a SQLite database, one transaction per change"""
+    INITIALISED = 1  # PRAGMA user_version once seeded or imported, so emptied tables stay empty
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.data_manager = None
+        self.init_database()
+
+    def bind(self, data_manager: 'DataManager'):
+        self.data_manager = data_manager
+
+    def init_database(self):
+        conn = sqlite3.connect(self.db_path)
+        with conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS rules (
+                    rule_id TEXT PRIMARY KEY,
+                    title TEXT NOT NULL,
+                    description TEXT,
+                    symptoms TEXT NOT NULL,
+                    solution TEXT,
+                    category TEXT,
+                    priority INTEGER DEFAULT 1,
+                    confidence REAL DEFAULT 0.8,
+                    create_date TEXT,
+                    conclusions TEXT DEFAULT '[]'
+                )
+            ''')
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(rules)")]
+            if 'conclusions' not in columns:
+                conn.execute("ALTER TABLE rules ADD COLUMN conclusions TEXT DEFAULT '[]'")
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS cases (
+                    case_id TEXT PRIMARY KEY,
+                    symptoms TEXT NOT NULL,
+                    diagnosis TEXT,
+                    solutions TEXT,
+                    create_date TEXT,
+                    rule_id TEXT DEFAULT ''
+                )
+            ''')
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(cases)")]
+            if 'rule_id' not in columns:
+                conn.execute("ALTER TABLE cases ADD COLUMN rule_id TEXT DEFAULT ''")
+            # Databases written before user_version marked initialisation hold rows instead
+            if conn.execute("PRAGMA user_version").fetchone()[0] == 0 and conn.execute(
+                    "SELECT EXISTS(SELECT 1 FROM rules) OR EXISTS(SELECT 1 FROM cases)").fetchone()[0]:
+                conn.execute(f"PRAGMA user_version = {self.INITIALISED}")
+        conn.close()
+
+    @staticmethod
+    def rule_row(rule: TroubleshootingRule) -> tuple:
+        return (rule.rule_id, rule.title, rule.description, json.dumps(rule.symptoms),
+                rule.solution, rule.category, rule.priority, rule.confidence, rule.create_date,
+                json.dumps(rule.conclusions))
+
+    @staticmethod
+    def case_row(case: TroubleshootingCase) -> tuple:
+        return (case.case_id, json.dumps(case.symptoms), case.diagnosis,
+                json.dumps(case.solutions), case.create_date, case.rule_id)
+
+    def is_initialised(self) -> bool:
+        conn = sqlite3.connect(self.db_path)
+        try:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+        finally:
+            conn.close()
+        return version >= self.INITIALISED
+
+    def import_json(self, filename: str) -> bool:
+        """One-time import of a JSON knowledge base into a brand-new database"""
+        if self.is_initialised():
+            return False
+        # Goes through JsonStorage so changes still in its journals come along
+        data = JsonStorage(filename).load()
+        if data is None:
+            return False
+        rules = [TroubleshootingRule.from_dict(d) for d in data.get('rules', [])]
+        cases = [TroubleshootingCase.from_dict(d) for d in data.get('cases', [])]
+        self.write_rows(rules, cases)
+        return True
+
+    def load(self) -> Optional[Dict[str, list]]:
+        """Rules and cases without their long text fields, which load_rule_text/load_case_text fetch"""
+        if not self.is_initialised():
+            return None
+        conn = sqlite3.connect(self.db_path)
+        try:
+            rules = [{
+                'rule_id': row[0], 'title': row[1], 'symptoms': json.loads(row[2]),
+                'category': row[3], 'priority': row[4], 'confidence': row[5],
+                'create_date': row[6], 'conclusions': json.loads(row[7] or '[]')
+            } for row in conn.execute(
+                "SELECT rule_id, title, symptoms, category, priority, confidence, create_date, conclusions "
+                "FROM rules ORDER BY rowid")]
+            cases = [{
+                'case_id': row[0], 'symptoms': json.loads(row[1]),
+                'solutions': json.loads(row[2]), 'create_date': row[3], 'rule_id': row[4] or ''
+            } for row in conn.execute(
+                "SELECT case_id, symptoms, solutions, create_date, rule_id FROM cases ORDER BY rowid")]
+        finally:
+            conn.close()
+        return {'rules': rules, 'cases': cases}
+
+    def load_rule_text(self, rule_id: str) -> tuple:
+        conn = sqlite3.connect(self.db_path)
+        try:
+            row = conn.execute("SELECT description, solution FROM rules WHERE rule_id = ?", (rule_id,)).fetchone()
+        finally:
+            conn.close()
+        return row or ("", "")
+
+    def load_case_text(self, case_id: str) -> str:
+        conn = sqlite3.connect(self.db_path)
+        try:
+            row = conn.execute("SELECT diagnosis FROM cases WHERE case_id = ?", (case_id,)).fetchone()
+        finally:
+            conn.close()
+        return row[0] if row else ""
+
+    def write_rows(self, rules: List[TroubleshootingRule], cases: List[TroubleshootingCase]):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            with conn:
+                conn.executemany("INSERT OR REPLACE INTO rules VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                 [self.rule_row(rule) for rule in rules])
+                conn.executemany("INSERT OR REPLACE INTO cases VALUES (?, ?, ?, ?, ?, ?)",
+                                 [self.case_row(case) for case in cases])
+                conn.execute(f"PRAGMA user_version = {self.INITIALISED}")
+        finally:
+            conn.close()
+
+    def execute(self, query: str, params: tuple):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            with conn:
+                conn.execute(query, params)
+        finally:
+            conn.close()
+
+    def save_all(self):
+        self.write_rows(list(self.data_manager.rules.values()), list(self.data_manager.cases.values()))
+
+    def put_rule(self, rule: TroubleshootingRule):
+        self.execute("INSERT OR REPLACE INTO rules VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", self.rule_row(rule))
+
+    def delete_rule(self, rule_id: str):
+        self.execute("DELETE FROM rules WHERE rule_id = ?", (rule_id,))
+
+    def put_case(self, case: TroubleshootingCase):
+        self.execute("INSERT OR REPLACE INTO cases VALUES (?, ?, ?, ?, ?, ?)", self.case_row(case))
+
+    def delete_case(self, case_id: str):
+        self.execute("DELETE FROM cases WHERE case_id = ?", (case_id,))
+
+
+class DataManager:
+    """Handles all CRUD operations and persistence"""
+    SQLITE_EXTENSIONS = ('.db', '.sqlite', '.sqlite3')
+
+    def __init__(self, filename: str = "expert_system_data.json", storage=None):
+        self.filename = filename
+        if storage is None:
+            if filename.lower().endswith(self.SQLITE_EXTENSIONS):
+                storage = SqliteStorage(filename)
+                # Carry over a knowledge base kept in JSON by earlier versions
+                try:
+                    storage.import_json(os.path.splitext(filename)[0] + ".json")
+                except Exception as e:
+                    # The database stays uninitialised, so sample data is seeded instead
+                    print(f"Error importing JSON data: {e}")
+            else:
+                storage = JsonStorage(filename)
+        self.storage = storage
+        self.storage.bind(self)
+        self.rules: Dict[TroubleshootingRule] = {}
+        self.cases: Dict[TroubleshootingCase] = {}
+        self.symptoms_list = set()
+        self.rule_index = RuleIndex()
+        self.case_index = CaseIndex()
+        self.bayes = NaiveBayesModel()
+        self.version = 0  # bumped whenever the rule base changes
+        self.load_data()
+    
+    def load_data(self):
+        """Load data from storage"""
+        try:
+            data = self.storage.load()
+        except Exception as e:
+            print(f"Error Loading data: {e}")
+            data = None
+        if data is None:
+            self.create_sample_data()
+            return
+
+        # Long text fields stay in storage until needed when the backend can fetch them
+        lazy_text = hasattr(self.storage, 'load_rule_text')
+        rule_text = self.load_rule_text if lazy_text else None
+        case_text = self.load_case_text if lazy_text else None
+
+        # Load rules
+        for rule_data in data.get('rules', []):
+            rule = TroubleshootingRule.from_dict(rule_data, rule_text)
+            self.rules[rule.rule_id] = rule
+            self.rule_index.add_rule(rule)
+            self.bayes.add_rule(rule)
+            self.symptoms_list.update(rule.symptoms)
+
+        # Load cases
+        for case_data in data.get('cases', []):
+            case = TroubleshootingCase.from_dict(case_data, case_text)
+            self.cases[case.case_id] = case
+            self.case_index.add_case(case)
+            self.bayes.add_case(case)
+
+    def save_data(self):
+        """Write the whole knowledge base to storage"""
+        try:
+            self.storage.save_all()
+        except Exception as e:
+            print(f"Error saving data{e}")
+
+    def load_rule_text(self, rule_id: str) -> tuple:
+        """Fetch a rule's description and solution through whatever storage is attached now"""
+        if self.storage is None:
+            return ("", "")
+        return self.storage.load_rule_text(rule_id)
+
+    def load_case_text(self, case_id: str) -> str:
+        if self.storage is None:
+            return ""
+        return self.storage.load_case_text(case_id)
+
+    def __getstate__(self):
+        # Copies sent to worker processes are read-only and leave storage behind
+        state = self.__dict__.copy()
+        state['storage'] = None
+        return state
+
+    def write(self, operation: str, *args):
+        """Persist a single change through the storage backend"""
+        try:
+            getattr(self.storage, operation)(*args)
+        except Exception as e:
+            print(f"Error saving data{e}")
+    
+    def create_sample_data(self):
+        """Create sample troubleshooting rules and data"""
+        sample_rules = [
+            TroubleshootingRule(
+                "RULE001", "Computer Won't Start",
+                "Computer doesn't power on at all",
+                ["No power light", "No fan noise", "Screen blank"],
+                "1. Check power cable connection\n2. Verify power outlet works\n3. Check power supply switch\n4. Test with different power cable",
+                "Hardware", 1, 0.9, ["Power issue"]
+            ),
+            TroubleshootingRule(
+                "RULE002", "Blue screen of death",
+                "Computer crashes woth blue screen error",
+                ["Blue screen", "Automatic restart", "error code"],
+                "1. Note error code\n2. Check recent software/hardware changes\n3. Run memory diagnostic\n4. Update drivers\n5. Check for overheating",
+                "Software", 2, 0.85
+            ),
+            TroubleshootingRule(
+                "RULE003", "Slow Performance",
+                "Computer runs very slowly ",
+                ["Slow boot time", "Programs lag", "High CPU usage"],
+                "1. Run Antivirus scan\n2. Check startuo programs\n3. Clean temperary files\n4. Add more RAM if needed\n5. Defragment haed drive",
+                "Performance", 1, 0.8
+            ),
+            TroubleshootingRule(
+                "RULE004", "Internet Connection issues",
+                "Cannot connect to internet",
+                ["No Internet access", "Connection timeout", "DNS errors"],
+                "1. Check cable connections\n2. Restart router/modern\n3. Run network troubleshooter\n4. Update network drivers\n5. Restart network settings",
+                "Network", 1, 0.85
+            ),
+            TroubleshootingRule(
+                "RULE005", "Overheating issues",
+                "Computer gets too hot and shuts down",
+                ["Computer hot to touch", "Automatic shutdown", "Fan noise loud"],
+                "1. Clean dust from vents and fans\n2. Check therminal paste\n3. Ensure proper ventilation\n4. Check fan functionality\n5. Reduce CPU load",
+                "Hardware", 2, 0.9
+            ),
+            TroubleshootingRule(
+                "RULE006", "Failing Power Supply",
+                "Power supply unit no longer delivers stable power",
+                ["Power issue", "Burning smell", "Clicking sound"],
+                "1. Switch off and unplug immediately\n2. Check PSU fan and capacitors\n3. Replace the power supply unit",
+                "Hardware", 3, 0.85
+            )
+        ]
+        
+        for rule in sample_rules:
+            self.rules[rule.rule_id] = rule
+            self.rule_index.add_rule(rule)
+            self.bayes.add_rule(rule)
+            self.symptoms_list.update(rule.symptoms)
+
+        self.save_data()
+    
+    # CRUD Operations for rules
+    def create_rule(self, rule: TroubleshootingRule) -> bool:
+        if rule.rule_id not in self.rules:
+            self.rules[rule.rule_id] = rule
+            self.rule_index.add_rule(rule)
+            self.bayes.add_rule(rule)
+            self.symptoms_list.update(rule.symptoms)
+            self.version += 1
+            self.write('put_rule', rule)
+            return True
+        return False
+    
+    def read_rule(self, rule_id: str) -> Optional[TroubleshootingRule]:
+        return self.rules.get(rule_id)
+    
+    def read_all_rules(self) -> List[TroubleshootingRule]:
+        return list(self.rules.values())
+    
+    def update_rule(self, rule: TroubleshootingRule) -> bool:
+        if rule.rule_id in self.rules:
+            old_rule = self.rules[rule.rule_id]
+            self.rule_index.remove_rule(old_rule)
+            self.bayes.remove_rule(old_rule)
+            self.rules[rule.rule_id] = rule
+            self.rule_index.add_rule(rule)
+            self.bayes.add_rule(rule)
+            # Update symptoms
+            for symptom in old_rule.symptoms:
+                if symptom not in self.rule_index.symptom_counts:
+                    self.symptoms_list.discard(symptom)
+            self.symptoms_list.update(rule.symptoms)
+            self.version += 1
+            self.write('put_rule', rule)
+            return True
+        return False
+    
+    def delete_rule(self, rule_id: str) -> bool:
+        if rule_id in self.rules:
+            old_rule = self.rules.pop(rule_id)
+            self.rule_index.remove_rule(old_rule)
+            self.bayes.remove_rule(old_rule)
+            # Clean up symptoms that are no longer used
+            for symptom in old_rule.symptoms:
+                if symptom not in self.rule_index.symptom_counts:
+                    self.symptoms_list.discard(symptom)
+            self.version += 1
+            self.write('delete_rule', rule_id)
+            return True
+        return False
+    
+    # CRUD Operaions for Cases
+    def create_case(self, case: TroubleshootingCase) -> bool:
+        if case.case_id not in self.cases:
+            self.cases[case.case_id] = case
+            self.case_index.add_case(case)
+            self.bayes.add_case(case)
+            self.write('put_case', case)
+            return True
+        return False
+    
+    def read_case(self, case_id: str) -> Optional[TroubleshootingCase]:
+        return self.cases.get(case_id)
+
+    def read_all_cases(self) -> List[TroubleshootingCase]:
+        return list(self.cases.values())
+    
+    def update_case(self, case: TroubleshootingCase) -> bool:
+        if case.case_id in self.cases:
+            self.case_index.remove_case(case.case_id)
+            self.bayes.remove_case(self.cases[case.case_id])
+            self.cases[case.case_id] = case
+            self.case_index.add_case(case)
+            self.bayes.add_case(case)
+            self.write('put_case', case)
+            return True
+        return False
+    
+    def delete_case(self, case_id: str) -> bool:
+        if case_id in self.cases:
+            old_case = self.cases.pop(case_id)
+            self.case_index.remove_case(case_id)
+            self.bayes.remove_case(old_case)
+            self.write('delete_case', case_id)
+            return True
+        return False
+    
+    def get_all_symptoms(self) -> List[str]:
+        return sorted(list(self.symptoms_list))
+
+
+class IncrementalMatcher:
+    """Keeps partial rule matches for a symptom selection that changes one symptom at a time
+
+    In the manner of TREAT, the weighted match count of every partially matched
+    rule is kept between calls, and toggling a symptom only touches the rules
+    indexed under the symptoms it resolves to.
+    """
+    def __init__(self, data_manager: DataManager):
+        self.data_manager = data_manager
+        self.reset()
+
+    def reset(self):
+        self.selected: Set[str] = set()
+        self.contributions: Dict[str, Dict[str, float]] = {}  # symptom -> {selected: weight}
+        self.weights: Dict[str, float] = {}  # symptom -> best weight
+        self.scores: Dict[str, float] = {}  # rule_id -> weighted matched symptoms
+        self.version = self.data_manager.version
+
+    def rebuild(self):
+        """Recompute every partial match after the rule base changed"""
+        selected = self.selected
+        self.reset()
+        for symptom in selected:
+            self.add_symptom(symptom)
+
+    def update_weight(self, symptom: str):
+        contributions = self.contributions.get(symptom)
+        new_weight = max(contributions.values()) if contributions else 0.0
+        delta = new_weight - self.weights.get(symptom, 0.0)
+        if not delta:
+            return
+        if new_weight:
+            self.weights[symptom] = new_weight
+        else:
+            self.weights.pop(symptom, None)
+            self.contributions.pop(symptom, None)
+        index = self.data_manager.rule_index
+        for rule_id in index.symptom_rules[symptom]:
+            # Summed afresh from the weights: adding deltas up would drift after many toggles
+            score = sum(self.weights.get(s, 0.0) for s in index.rule_symptoms[rule_id])
+            if score:
+                self.scores[rule_id] = score
+            else:
+                self.scores.pop(rule_id, None)
+
+    def add_symptom(self, selected: str):
+        if selected in self.selected:
+            return
+        self.selected.add(selected)
+        for symptom, weight in self.data_manager.rule_index.matcher.resolve(selected).items():
+            self.contributions.setdefault(symptom, {})[selected] = weight
+            self.update_weight(symptom)
+
+    def remove_symptom(self, selected: str):
+        if selected not in self.selected:
+            return
+        self.selected.discard(selected)
+        for symptom in self.data_manager.rule_index.matcher.resolve(selected):
+            self.contributions.get(symptom, {}).pop(selected, None)
+            self.update_weight(symptom)
+
+
+class InferenceEngine:
+    """Simple forward-chaining inference engine"""
+    FIRE_RATIO = 0.5  # share of a rule's symptoms that must hold before it asserts its conclusions
+
+    def __init__(self, data_manager: DataManager):
+        self.data_manager = data_manager
+        self.session = IncrementalMatcher(data_manager)
+
+    def chain(self, weights: Dict[str, float], scores: Dict[str, float]) -> tuple:
+        """Fire rules that conclude facts until no rule can add anything new
+
+        Each cycle fires every rule on the agenda once. When several rules
+        assert the same fact, conflict resolution picks the one with the
+        highest priority, then the highest confidence, and its confidence
+        becomes the fact's weight. New facts are then propagated once each to
+        the rules indexed under them. Returns the scores including derived
+        facts, and the derived facts.
+        """
+        index = self.data_manager.rule_index
+        rules = self.data_manager.rules
+        scores = dict(scores)
+        derived: Dict[str, float] = {}
+        fired = set()
+        touched = scores.keys()
+
+        while True:
+            agenda = []
+            for rule_id in touched:
+                rule = rules[rule_id]
+                if not rule.conclusions or rule_id in fired:
+                    continue
+                # Rounded as in rank() so scores summed in any order fire and weigh the same
+                match_ratio = round(scores[rule_id] / len(rule.symptoms), 9)
+                if match_ratio >= self.FIRE_RATIO:
+                    agenda.append((-rule.priority, -round(rule.confidence * match_ratio, 9), rule_id))
+            if not agenda:
+                return scores, derived
+
+            asserted: Dict[str, float] = {}
+            for _, negative_confidence, rule_id in sorted(agenda):
+                fired.add(rule_id)
+                for fact in rules[rule_id].conclusions:
+                    asserted.setdefault(fact.lower(), -negative_confidence)
+
+            touched = set()
+            for fact, weight in asserted.items():
+                current = max(weights.get(fact, 0.0), derived.get(fact, 0.0))
+                if weight <= current:
+                    continue
+                derived[fact] = weight
+                for consumer_id, occurrences in index.symptom_rules.get(fact, {}).items():
+                    scores[consumer_id] = scores.get(consumer_id, 0.0) + (weight - current) * occurrences
+                    touched.add(consumer_id)
+
+    def infer(self, selected_symptoms: List[str]) -> tuple:
+        """Top (rule, confidence) matches after chaining, and the derived facts"""
+        index = self.data_manager.rule_index
+        scores, derived = self.chain(index.resolve_symptoms(selected_symptoms),
+                                     index.candidate_rules(selected_symptoms))
+        return self.rank(scores), derived
+    
+    def rank(self, scores: Dict[str, float], limit: int = 5) -> List[tuple]:
+        """Top (rule, confidence) pairs for weighted symptom matches per rule"""
+        matches = []
+        rules = self.data_manager.rules
+        # Visit rules in id order so full ties come out the same however the scores were built
+        for rule_id in sorted(scores):
+            rule = rules[rule_id]
+            # Calculate confidence based on symptom match ratio
+            match_ratio = scores[rule_id] / len(rule.symptoms)
+            # Rounded so scores summed in a different order still tie and priority decides
+            confidence = round(rule.confidence * match_ratio, 9)
+            matches.append((rule, confidence))
+
+        # Sort by confidence and priority
+        return heapq.nlargest(limit, matches, key=lambda x: (x[1], x[0].priority))
+
+    def diagnose(self, selected_symptoms: List[str]) -> List[tuple]:
+        """Returns kust of (rulem confidence_score) tules"""
+        # Only rules sharing a symptom with the selection are scored, each
+        # matched symptom counting by how closely it was matched
+        return self.infer(selected_symptoms)[0] # Return to[ 5 matches]
+
+    def toggle_symptom(self, symptom: str, selected: bool) -> tuple:
+        """Update the interactive session by one symptom and return its matches and derived facts"""
+        if self.session.version != self.data_manager.version:
+            self.session.rebuild()
+        if selected:
+            self.session.add_symptom(symptom)
+        else:
+            self.session.remove_symptom(symptom)
+        scores, derived = self.chain(self.session.weights, self.session.scores)
+        return self.rank(scores), derived
+
+    def reset_session(self):
+        self.session.reset()
+
+    def diagnose_bayes(self, selected_symptoms: List[str], limit: int = 5) -> List[tuple]:
+        """Top (rule, posterior probability) pairs from the naive Bayes model"""
+        weights = self.data_manager.rule_index.resolve_symptoms(selected_symptoms)
+        if not weights:
+            return []
+        model = self.data_manager.bayes
+        rules = self.data_manager.rules
+        # Cases may outlive the rule they were labelled with; leave those labels out
+        probabilities = model.posteriors(weights, rules)
+        matches = []
+        for index in probabilities.argsort()[::-1]:
+            if probabilities[index] <= 0 or len(matches) == limit:
+                break
+            matches.append((rules[model.labels[index]], float(probabilities[index])))
+        return matches
+
+    def similar_cases(self, selected_symptoms: List[str], k: int = 3) -> List[tuple]:
+        """The k saved (case, similarity) pairs whose symptoms best overlap the selection"""
+        cases = self.data_manager.cases
+        return [(cases[case_id], similarity)
+                for case_id, similarity in self.data_manager.case_index.query(selected_symptoms, k)]
+    
+    
+_batch_engine: Optional[InferenceEngine] = None
+
+
+def init_batch_worker(engine: InferenceEngine):
+    """Pool initializer: keep the engine and its compiled rule index for every task in this process"""
+    global _batch_engine
+    _batch_engine = engine
+
+
+def diagnose_line(item: tuple) -> Dict[str, Any]:
+    """Diagnose one JSONL record, either {"id": ..., "symptoms": [...]} or a bare symptom list"""
+    line_number, line = item
+    try:
+        record = json.loads(line)
+        if isinstance(record, list):
+            record = {'symptoms': record}
+        if not isinstance(record, dict):
+            raise TypeError("record must be an object or a symptom list")
+        symptoms = record['symptoms']
+        if not isinstance(symptoms, list) or not all(isinstance(s, str) for s in symptoms):
+            raise TypeError("'symptoms' must be a list of strings")
+    except (ValueError, KeyError, TypeError) as e:
+        return {'line': line_number, 'error': str(e)}
+
+    try:
+        matches, derived = _batch_engine.infer(symptoms)
+        return {
+            'id': record.get('id', line_number),
+            'symptoms': symptoms,
+            'matches': [{'rule_id': rule.rule_id, 'title': rule.title, 'confidence': round(confidence, 4)}
+                        for rule, confidence in matches],
+            'derived_facts': {fact: round(weight, 4) for fact, weight in derived.items()},
+            'similar_cases': [{'case_id': case.case_id, 'similarity': round(similarity, 4)}
+                              for case, similarity in _batch_engine.similar_cases(symptoms)]
+        }
+    except Exception as e:
+        # One bad record must not abort the run (or a whole pool of workers)
+        return {'line': line_number, 'error': f"{type(e).__name__}: {e}"}
+
+
+def run_batch(engine: InferenceEngine, lines: Iterable[str], workers: int = 1,
+              chunksize: int = 64) -> Iterator[Dict[str, Any]]:
+    """Diagnose JSONL lines, yielding one result per non-blank line in input order"""
+    items = ((number, line) for number, line in enumerate(lines, 1) if line.strip())
+    if workers <= 1:
+        init_batch_worker(engine)
+        yield from map(diagnose_line, items)
+        return
+    with multiprocessing.Pool(workers, initializer=init_batch_worker, initargs=(engine,)) as pool:
+        yield from pool.imap(diagnose_line, items, chunksize)
+
+
+def batch_main(args: argparse.Namespace) -> int:
+    """Stream diagnoses for a JSONL file to JSONL output, with throughput on stderr"""
+    engine = InferenceEngine(DataManager(args.data))
+    workers = max(1, args.workers)
+    out = open(args.out, 'w', encoding='utf-8') if args.out else sys.stdout
+    count = errors = 0
+    start = time.perf_counter()
+    try:
+        with open(args.batch, 'r', encoding='utf-8') as src:
+            for result in run_batch(engine, src, workers):
+                out.write(json.dumps(result, ensure_ascii=False) + "\n")
+                count += 1
+                errors += 'error' in result
+                if count % 10000 == 0:
+                    elapsed = time.perf_counter() - start
+                    print(f"{count} diagnoses, {count / elapsed:.0f}/s", file=sys.stderr)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - start
+    print(f"{count} diagnoses ({errors} errors) in {elapsed:.2f}s, "
+          f"{count / elapsed if elapsed else 0:.0f}/s with {workers} worker(s)", file=sys.stderr)
+    return 1 if errors else 0
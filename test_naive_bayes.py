@@ -0,0 +1,17 @@
+import pytest
+
+pytest.importorskip("numpy")
+from expert_system_core import DataManager, InferenceEngine, TroubleshootingCase
+
+
+def test_deleted_rule_takes_no_probability(tmp_path):
+    manager = DataManager(str(tmp_path / "kb.db"))
+    engine = InferenceEngine(manager)
+    for i in range(20):
+        manager.create_case(TroubleshootingCase(f"C{i}", ["No power light"], "PSU", [], rule_id="RULE002"))
+    manager.delete_rule("RULE002")
+
+    matches = engine.diagnose_bayes(["No power light"])
+    assert matches[0][0].rule_id == "RULE001"
+    assert sum(probability for _, probability in engine.diagnose_bayes(["No power light"], limit=100)) == \
+        pytest.approx(1.0)
@@ -0,0 +1,139 @@
+import json
+import os
+
+from expert_system_core import DataManager, JsonStorage, SqliteStorage, TroubleshootingRule, TroubleshootingCase
+
+
+def make_rule(rule_id, symptoms=("no power light",)):
+    return TroubleshootingRule(rule_id, f"Rule {rule_id}", f"About {rule_id}", list(symptoms),
+                               f"Fix {rule_id}", "Hardware")
+
+
+def test_new_database_is_seeded_once(tmp_path):
+    path = str(tmp_path / "kb.db")
+    seeded = set(DataManager(path).rules)
+    assert seeded
+    assert set(DataManager(path).rules) == seeded
+
+
+def test_changes_are_written_per_row(tmp_path):
+    path = str(tmp_path / "kb.db")
+    manager = DataManager(path)
+    manager.create_rule(make_rule("R100"))
+    manager.update_rule(make_rule("R100", ["screen blank"]))
+    manager.delete_rule("RULE001")
+    manager.create_case(TroubleshootingCase("C100", ["screen blank"], "Bad cable", ["Reseat it"], rule_id="R100"))
+
+    reopened = DataManager(path)
+    assert "RULE001" not in reopened.rules
+    assert reopened.rules["R100"].symptoms == ["screen blank"]
+    assert reopened.rules["R100"].solution == "Fix R100"
+    assert reopened.cases["C100"].diagnosis == "Bad cable"
+
+
+def test_emptied_database_stays_empty(tmp_path):
+    path = str(tmp_path / "kb.db")
+    manager = DataManager(path)
+    for rule_id in list(manager.rules):
+        manager.delete_rule(rule_id)
+    for case_id in list(manager.cases):
+        manager.delete_case(case_id)
+    assert not DataManager(path).rules
+
+
+def test_corrupt_legacy_json_does_not_stop_startup(tmp_path, capsys):
+    (tmp_path / "kb.json").write_text('{"rules": [{"rule_id": "R', encoding="utf-8")
+    manager = DataManager(str(tmp_path / "kb.db"))
+    assert manager.rules
+    assert "Error importing JSON data" in capsys.readouterr().out
+
+
+def test_import_skips_initialised_database(tmp_path):
+    path = str(tmp_path / "kb.db")
+    DataManager(path)
+    (tmp_path / "kb.json").write_text('{"rules": [], "cases": []}', encoding="utf-8")
+    assert not SqliteStorage(path).import_json(str(tmp_path / "kb.json"))
+
+
+def test_journal_replays_changes_since_snapshot(tmp_path):
+    path = str(tmp_path / "kb.json")
+    manager = DataManager(path)
+    manager.create_rule(make_rule("R100"))
+    manager.delete_rule("RULE001")
+    assert os.path.exists(path + ".journal")
+
+    reopened = DataManager(path)
+    assert "R100" in reopened.rules
+    assert "RULE001" not in reopened.rules
+
+
+def test_journal_ignores_torn_last_line(tmp_path):
+    path = str(tmp_path / "kb.json")
+    DataManager(path).create_rule(make_rule("R100"))
+    with open(path + ".journal", "a", encoding="utf-8") as f:
+        f.write('{"op": "put_rule", "data": {"rule_id"')
+    manager = DataManager(path)
+    manager.create_rule(make_rule("R101"))
+
+    reopened = DataManager(path)
+    assert {"R100", "R101"} <= set(reopened.rules)
+
+
+def test_compaction_merges_rotated_journal(tmp_path):
+    path = str(tmp_path / "kb.json")
+    storage = JsonStorage(path, journal_limit=512)
+    manager = DataManager(path, storage=storage)
+    for i in range(20):
+        manager.create_rule(make_rule(f"R{i:03}"))
+    storage.wait_for_compaction()
+    assert not os.path.exists(storage.rotated_name)
+
+    with open(path, encoding="utf-8") as f:
+        snapshot = {rule["rule_id"] for rule in json.load(f)["rules"]}
+    assert snapshot and snapshot <= set(manager.rules)
+    assert set(DataManager(path).rules) == set(manager.rules)
+
+
+def test_failed_compaction_is_merged_before_next_rotation(tmp_path, monkeypatch, capsys):
+    path = str(tmp_path / "kb.json")
+    storage = JsonStorage(path, journal_limit=512)
+    manager = DataManager(path, storage=storage)
+    compact = storage.compact
+
+    def failing_compact():
+        raise OSError("disk full")
+
+    monkeypatch.setattr(storage, "compact", failing_compact)
+    for i in range(10):
+        manager.create_rule(make_rule(f"A{i:03}"))
+    storage.wait_for_compaction()
+    assert os.path.exists(storage.rotated_name)
+    assert "Error compacting journal" in capsys.readouterr().out
+
+    monkeypatch.setattr(storage, "compact", compact)
+    for i in range(10):
+        manager.create_rule(make_rule(f"B{i:03}"))
+    storage.wait_for_compaction()
+    assert set(DataManager(path).rules) == set(manager.rules)
+
+
+def test_interrupted_compaction_is_finished_on_load(tmp_path):
+    path = str(tmp_path / "kb.json")
+    DataManager(path).create_rule(make_rule("R100"))
+    storage = JsonStorage(path)
+    os.replace(storage.journal_name, storage.rotated_name)
+
+    assert "R100" in DataManager(path).rules
+    assert not os.path.exists(storage.rotated_name)
+
+
+def test_sqlite_import_includes_journaled_changes(tmp_path):
+    json_path = str(tmp_path / "kb.json")
+    manager = DataManager(json_path)
+    manager.create_rule(make_rule("R100"))
+    manager.delete_rule("RULE001")
+    assert os.path.exists(json_path + ".journal")
+
+    imported = DataManager(str(tmp_path / "kb.db"))
+    assert set(imported.rules) == set(manager.rules)
+    assert imported.rules["R100"].solution == "Fix R100"
@@ -0,0 +1,47 @@
+import pytest
+
+from expert_system_core import SymptomMatcher
+
+
+SYMPTOMS = ("no power light", "no fan noise", "screen blank", "blue screen", "automatic restart",
+            "error code", "fan noise loud", "automatic shutdown", "computer won't start")
+
+
+@pytest.fixture
+def matcher():
+    matcher = SymptomMatcher()
+    for symptom in SYMPTOMS:
+        matcher.add(symptom)
+    return matcher
+
+
+@pytest.mark.parametrize("query, symptom", [
+    ("blue scren", "blue screen"),
+    ("automatc restart", "automatic restart"),
+    ("no powr light", "no power light"),
+    ("eror code", "error code"),
+    ("computer wont start", "computer won't start"),
+])
+def test_typos_resolve_to_symptom(matcher, query, symptom):
+    assert symptom in matcher.resolve(query)
+
+
+@pytest.mark.parametrize("query, symptom", [
+    ("no fan noise", "fan noise loud"),
+    ("automatic restart", "automatic shutdown"),
+    ("blue screen", "screen blank"),
+])
+def test_different_symptoms_stay_apart(matcher, query, symptom):
+    assert symptom not in matcher.resolve(query)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("n", {"no power light", "no fan noise"}),
+    ("no", {"no power light", "no fan noise"}),
+    ("fa", {"fan noise loud"}),
+    ("sc", {"screen blank"}),
+    ("fan noise", {"no fan noise", "fan noise loud"}),
+])
+def test_search_short_text_matches_prefixes_only(matcher, text, expected):
+    assert matcher.search(text) == expected
+